@@ -76,25 +76,19 @@ class AdvancedFeatures:
         """Graphique de vélocité des dépenses"""
         st.subheader("⚡ Vélocité des Dépenses")
         
-        # Calcul de la vélocité (dépenses par jour de la semaine)
-        df_depenses = self.analyzer.depenses_df.copy()
+        # Calcul de la vélocité (statistiques en ligne par jour de la semaine)
+        by_weekday = self.analyzer.online_stats.weekday_frame()
         
-        # Mapping des jours en français
-        day_mapping = {
-            'Monday': 'Lundi', 'Tuesday': 'Mardi', 'Wednesday': 'Mercredi',
-            'Thursday': 'Jeudi', 'Friday': 'Vendredi', 'Saturday': 'Samedi', 'Sunday': 'Dimanche'
-        }
-        
-        df_depenses['jour_fr'] = df_depenses['jour_semaine'].map(day_mapping)
+        # Jours de la semaine en français (0 = lundi)
+        day_names = ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi', 'Dimanche']
         
         # Analyse par jour de la semaine
-        daily_velocity = df_depenses.groupby('jour_fr').agg({
-            'montant': ['count', 'sum', 'mean']
+        daily_velocity = pd.DataFrame({
+            'nb_transactions': by_weekday['count'],
+            'total_depense': by_weekday['sum'],
+            'depense_moyenne': by_weekday['mean']
         }).round(2)
-        
-        daily_velocity.columns = ['nb_transactions', 'total_depense', 'depense_moyenne']
-        daily_velocity['total_depense'] = daily_velocity['total_depense'].abs()
-        daily_velocity['depense_moyenne'] = daily_velocity['depense_moyenne'].abs()
+        daily_velocity.index = [day_names[day] for day in by_weekday.index]
         
         # Réorganiser les jours
         day_order = ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi', 'Dimanche']
@@ -271,18 +265,8 @@ class AdvancedFeatures:
         """Matrice de corrélation des dépenses"""
         st.subheader("🔗 Corrélations entre Catégories")
         
-        # Préparer les données
-        daily_expenses = self.analyzer.depenses_df.groupby([
-            self.analyzer.depenses_df['date'].dt.date,
-            'categorie'
-        ])['montant'].sum().abs().reset_index()
-        
-        # Pivot pour avoir les catégories en colonnes
-        expense_matrix = daily_expenses.pivot(
-            index='date', 
-            columns='categorie', 
-            values='montant'
-        ).fillna(0)
+        # Matrice jours × catégories issue du cube
+        expense_matrix = self.analyzer.cube.daily_category_matrix()
         
         if expense_matrix.shape[1] > 2:  # Au moins 3 catégories
             # Calculer la matrice de corrélation
@@ -355,18 +339,13 @@ class AdvancedFeatures:
         """Analyse de saisonnalité des dépenses"""
         st.subheader("📅 Saisonnalité des Dépenses")
         
-        df = self.analyzer.depenses_df.copy()
-        
-        # Ajouter des colonnes pour l'analyse saisonnière
-        df['mois'] = df['date'].dt.month
-        df['trimestre'] = df['date'].dt.quarter
-        df['jour_annee'] = df['date'].dt.dayofyear
+        cube = self.analyzer.cube
         
         col1, col2 = st.columns(2)
         
         with col1:
             # Analyse par mois
-            monthly_seasonality = df.groupby('mois')['montant'].sum().abs()
+            monthly_seasonality = cube.expenses_by('month')['total'].abs()
             
             # Noms des mois
             month_names = ['Jan', 'Fév', 'Mar', 'Avr', 'Mai', 'Jun',
@@ -397,7 +376,7 @@ class AdvancedFeatures:
         
         with col2:
             # Analyse par trimestre
-            quarterly_seasonality = df.groupby('trimestre')['montant'].sum().abs()
+            quarterly_seasonality = cube.expenses_by('quarter')['total'].abs()
             quarter_names = ['T1', 'T2', 'T3', 'T4']
             
             fig = go.Figure(data=go.Bar(
@@ -432,18 +411,16 @@ class AdvancedFeatures:
         
         alerts = []
         
-        # Analyse des données récentes
-        recent_data = self.analyzer.depenses_df[
-            self.analyzer.depenses_df['date'] >= 
-            (self.analyzer.depenses_df['date'].max() - timedelta(days=7))
-        ]
+        # Analyse des données récentes (7 derniers jours du cube)
+        cube = self.analyzer.cube
+        last_date = cube.last_expense_date()
+        recent_cube = cube.slice(last_date - timedelta(days=7), None) if last_date is not None else None
         
-        if not recent_data.empty:
-            # Alert 1: Dépenses inhabituellement élevées
-            recent_daily = recent_data.groupby(recent_data['date'].dt.date)['montant'].sum().abs()
-            historical_avg = self.analyzer.depenses_df.groupby(
-                self.analyzer.depenses_df['date'].dt.date
-            )['montant'].sum().abs().mean()
+        if recent_cube is not None and recent_cube.nb_debits.sum() > 0:
+            # Alert 1: Dépenses inhabituellement élevées (moyenne quotidienne
+            # historique tenue à jour en ligne, totaux récents lus dans le cube)
+            recent_daily = recent_cube.daily_expenses()
+            historical_avg = self.analyzer.daily_spending_stats.mean
             
             max_recent = recent_daily.max()
             if max_recent > historical_avg * 2:
@@ -455,8 +432,9 @@ class AdvancedFeatures:
                 })
             
             # Alert 2: Nouvelle catégorie de dépense
-            recent_categories = set(recent_data['categorie'].unique())
-            historical_categories = set(self.analyzer.depenses_df['categorie'].unique())
+            recent_counts = cube.range_totals(last_date - timedelta(days=7), None)['count']
+            recent_categories = set(recent_counts.index)
+            historical_categories = set(cube.category_totals().index)
             new_categories = recent_categories - historical_categories
             
             if new_categories:
@@ -468,7 +446,7 @@ class AdvancedFeatures:
                 })
             
             # Alert 3: Fréquence inhabituelle
-            category_freq = recent_data['categorie'].value_counts()
+            category_freq = recent_counts.sort_values(ascending=False)
             for cat, freq in category_freq.items():
                 if freq > 10:  # Plus de 10 transactions en 7 jours
                     alerts.append({
@@ -0,0 +1,538 @@
+import numpy as np
+import pandas as pd
+
+from periods import day_bounds
+from schema import EPOCH, to_day_numbers
+
+# Regroupements calendaires disponibles pour ``DailyCategoryCube.expenses_by``
+CALENDAR_KEYS = ('weekday', 'month', 'quarter')
+
+# Tableaux période × catégorie (dépenses) et tableaux par période (tous flux)
+CELL_FIELDS = ('sums', 'counts', 'sumsq')
+FLOW_FIELDS = ('credits', 'debits', 'nb_credits', 'nb_debits', 'nb_transactions')
+
+# Colonnes de l'index de sommes préfixes : cellules (une colonne par catégorie) puis flux
+INDEX_FIELDS = CELL_FIELDS + FLOW_FIELDS
+
+
+def bucket_keys(days, freq='D'):
+    """Clés entières de regroupement de numéros de jour : jour ('D'), semaine ('W', lundi-dimanche)
+    ou mois calendaire ('M') depuis 1970"""
+    days = np.asarray(days, dtype=np.int64)
+    if freq == 'D':
+        return days
+    if freq == 'W':
+        # Le 1970-01-01 est un jeudi : les semaines démarrent le lundi
+        return (days + 3) // 7
+    if freq == 'M':
+        return days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    raise ValueError(f"Granularité inconnue: {freq}")
+
+
+class FenwickTree:
+    """Arbre de Fenwick (binary indexed tree) sur les lignes d'un tableau 2-D
+
+    Somme des lignes ``[0, i)``, ajout à des lignes existantes et ajout de
+    lignes en fin de tableau en O(log n) chacun, chaque opération étant
+    vectorisée sur les colonnes.
+    """
+
+    def __init__(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        n = len(values)
+        prefix = np.zeros((n + 1, values.shape[1]))
+        np.cumsum(values, axis=0, out=prefix[1:])
+        # Le nœud i couvre les lignes (i - lowbit(i), i] ; capacité doublée pour les ajouts
+        nodes = np.arange(1, n + 1)
+        self.size = n
+        self._tree = np.zeros((2 * n + 16, values.shape[1]))
+        self._tree[1:n + 1] = prefix[nodes] - prefix[nodes - (nodes & -nodes)]
+
+    def __len__(self):
+        return self.size
+
+    def copy(self):
+        other = FenwickTree.__new__(FenwickTree)
+        other.size = self.size
+        other._tree = self._tree.copy()
+        return other
+
+    def prefix(self, i):
+        """Somme des lignes ``[0, i)``"""
+        i = int(i)
+        total = np.zeros(self._tree.shape[1])
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def range_sum(self, lo, hi):
+        """Somme des lignes ``[lo, hi)`` : deux lectures de préfixe"""
+        return self.prefix(hi) - self.prefix(lo)
+
+    def add(self, rows, deltas):
+        """Ajoute ``deltas[k]`` à la ligne existante ``rows[k]``"""
+        nodes = np.asarray(rows, dtype=np.int64) + 1
+        deltas = np.asarray(deltas, dtype=np.float64)
+        while len(nodes):
+            np.add.at(self._tree, nodes, deltas)
+            nodes = nodes + (nodes & -nodes)
+            keep = nodes <= self.size
+            nodes, deltas = nodes[keep], deltas[keep]
+
+    def append(self, values):
+        """Ajoute des lignes en fin de tableau"""
+        values = np.asarray(values, dtype=np.float64)
+        needed = self.size + len(values) + 1
+        if needed > len(self._tree):
+            grown = np.zeros((max(needed, 2 * len(self._tree)), self._tree.shape[1]))
+            grown[:self.size + 1] = self._tree[:self.size + 1]
+            self._tree = grown
+        for row in values:
+            # Le nouveau nœud i agrège sa ligne et les nœuds couvrant (i - lowbit(i), i - 1]
+            i = self.size + 1
+            node = row.copy()
+            j, stop = i - 1, i - (i & -i)
+            while j > stop:
+                node += self._tree[j]
+                j -= j & -j
+            self._tree[i] = node
+            self.size = i
+
+
+class DailyCategoryCube:
+    """Agrégat dense jour × catégorie des transactions
+
+    Pour chaque jour, de la première à la dernière transaction, et chaque
+    catégorie : somme, nombre et somme des carrés des montants de dépense.
+    Les crédits et débits de chaque jour (toutes catégories) sont conservés à
+    part. Les résultats hebdomadaires, mensuels, par jour de semaine ou par
+    catégorie se calculent sur ces quelques milliers de cellules au lieu des
+    transactions brutes.
+
+    Les cumuls hebdomadaires et mensuels (``rollup``), les totaux par
+    catégorie et l'index de sommes préfixes (``range_totals``) sont
+    construits à la demande, puis mis à jour en place par
+    ``add_transactions`` : seuls les jours, semaines, mois et catégories
+    touchés par un nouveau lot sont modifiés.
+    """
+
+    def __init__(self, categories=(), first_key=0, length=0, freq='D'):
+        self.freq = freq
+        self.first_key = first_key
+        self.categories = list(categories)
+        for field in CELL_FIELDS:
+            dtype = np.int64 if field == 'counts' else np.float64
+            setattr(self, field, np.zeros((length, len(self.categories)), dtype=dtype))
+        for field in FLOW_FIELDS:
+            dtype = np.float64 if field in ('credits', 'debits') else np.int64
+            setattr(self, field, np.zeros(length, dtype=dtype))
+        self._rollups = {}
+        self._totals = None
+        self._index = None
+        # Un sous-cube (``slice``) interroge l'index de son cube d'origine
+        self._index_owner = None
+
+    @classmethod
+    def from_transactions(cls, df):
+        """Construit le cube à partir de transactions au schéma standard"""
+        categorie = df['categorie']
+        if isinstance(categorie.dtype, pd.CategoricalDtype):
+            categories = list(categorie.cat.categories)
+        else:
+            categories = sorted(categorie.dropna().unique())
+        cube = cls(categories)
+        cube.add_transactions(df)
+        return cube
+
+    def __len__(self):
+        return len(self.debits)
+
+    @property
+    def first_day(self):
+        """Premier numéro de jour du cube (granularité journalière)"""
+        return self.first_key
+
+    @property
+    def days(self):
+        """Numéros de jour (int) couverts par le cube"""
+        return np.arange(self.first_key, self.first_key + len(self), dtype=np.int64)
+
+    @property
+    def dates(self):
+        """Dates couvertes par le cube"""
+        return pd.DatetimeIndex((EPOCH + self.days.astype('timedelta64[D]')).astype('datetime64[ns]'),
+                                name='date')
+
+    def copy(self):
+        """Copie indépendante (tableaux, cumuls et totaux compris)"""
+        other = DailyCategoryCube(self.categories, self.first_key, 0, self.freq)
+        for field in CELL_FIELDS + FLOW_FIELDS:
+            setattr(other, field, getattr(self, field).copy())
+        other._rollups = {freq: rollup.copy() for freq, rollup in self._rollups.items()}
+        other._totals = None if self._totals is None else self._totals.copy()
+        other._index = None if self._index is None else self._index.copy()
+        return other
+
+    def _encode(self, df):
+        """Numéros de jour, codes de catégorie (-1 si absente) et montants d'un lot
+
+        Les catégories inconnues du cube y sont ajoutées, en conservant l'ordre
+        alphabétique des colonnes.
+        """
+        values = df['categorie'].astype(object)
+        new_categories = set(values.dropna().unique()) - set(self.categories)
+        if new_categories:
+            self._set_categories(sorted(set(self.categories) | new_categories))
+
+        positions = {categorie: code for code, categorie in enumerate(self.categories)}
+        codes = values.map(positions).fillna(-1).to_numpy(dtype=np.int64)
+        days = to_day_numbers(df['date']).astype(np.int64)
+        montants = df['montant'].to_numpy(dtype=np.float64)
+        return days, codes, montants
+
+    def _set_categories(self, categories):
+        """Réordonne ou élargit l'axe des catégories (nouvelles colonnes à zéro)"""
+        old_positions = {categorie: code for code, categorie in enumerate(self.categories)}
+        for field in CELL_FIELDS:
+            old = getattr(self, field)
+            new = np.zeros((len(old), len(categories)), dtype=old.dtype)
+            for code, categorie in enumerate(categories):
+                if categorie in old_positions:
+                    new[:, code] = old[:, old_positions[categorie]]
+            setattr(self, field, new)
+        self.categories = list(categories)
+        # Colonnes de l'index modifiées : reconstruit à la prochaine requête
+        self._index = None
+        for rollup in self._rollups.values():
+            rollup._set_categories(categories)
+        if self._totals is not None:
+            self._totals = self._totals.reindex(self.categories, fill_value=0)
+            self._totals.index.name = 'categorie'
+
+    def _extend(self, first_key, last_key):
+        """Élargit l'axe temporel pour couvrir ``first_key..last_key`` (nouvelles lignes à zéro)"""
+        if len(self) == 0:
+            self.first_key = first_key
+            before, after = 0, last_key - first_key + 1
+        else:
+            before = max(0, self.first_key - first_key)
+            after = max(0, last_key - (self.first_key + len(self) - 1))
+        if before == 0 and after == 0:
+            return
+        for field in CELL_FIELDS + FLOW_FIELDS:
+            old = getattr(self, field)
+            padding = [(before, after)] + [(0, 0)] * (old.ndim - 1)
+            setattr(self, field, np.pad(old, padding))
+        self.first_key -= before
+
+    def add_transactions(self, df):
+        """Ajoute (en place) un lot de transactions au schéma standard
+
+        Le coût dépend de la taille du lot et de la plage de jours qu'il
+        couvre, pas de la longueur de l'historique déjà agrégé.
+        """
+        if df.empty:
+            return
+        days, codes, montants = self._encode(df)
+        self._add_encoded(days, codes, montants)
+
+    def _add_encoded(self, days, codes, montants):
+        """Cumule un lot déjà encodé dans le cube, ses cumuls et ses totaux"""
+        keys = bucket_keys(days, self.freq)
+        lo_key, hi_key = int(keys.min()), int(keys.max())
+        old_first_key, old_length = self.first_key, len(self)
+        self._extend(lo_key, hi_key)
+
+        # Seule la plage de lignes touchée par le lot est mise à jour
+        lo = lo_key - self.first_key
+        hi = hi_key - self.first_key + 1
+        positions = keys - lo_key
+        touched = hi - lo
+
+        # Lignes déjà indexées touchées par le lot, avant mise à jour
+        self._index_owner = None
+        if self._index is not None and self.first_key != old_first_key:
+            # Jours ajoutés avant le début : positions décalées, index reconstruit
+            self._index = None
+        if self._index is not None:
+            indexed_hi = max(lo, min(hi, old_length))
+            before = self._index_rows(lo, indexed_hi)
+
+        nb_categories = len(self.categories)
+        expense = (montants < 0) & (codes >= 0)
+        if nb_categories:
+            cells = positions[expense] * nb_categories + codes[expense]
+            size = touched * nb_categories
+            shape = (touched, nb_categories)
+            self.sums[lo:hi] += np.bincount(cells, weights=montants[expense], minlength=size).reshape(shape)
+            self.counts[lo:hi] += np.bincount(cells, minlength=size).reshape(shape)
+            self.sumsq[lo:hi] += np.bincount(cells, weights=montants[expense] ** 2,
+                                             minlength=size).reshape(shape)
+
+        credit = montants > 0
+        debit = montants < 0
+        self.credits[lo:hi] += np.bincount(positions[credit], weights=montants[credit], minlength=touched)
+        self.debits[lo:hi] += np.bincount(positions[debit], weights=montants[debit], minlength=touched)
+        self.nb_credits[lo:hi] += np.bincount(positions[credit], minlength=touched)
+        self.nb_debits[lo:hi] += np.bincount(positions[debit], minlength=touched)
+        self.nb_transactions[lo:hi] += np.bincount(positions, minlength=touched)
+
+        if self._index is not None:
+            if lo < indexed_hi:
+                self._index.add(np.arange(lo, indexed_hi), self._index_rows(lo, indexed_hi) - before)
+            if len(self) > old_length:
+                self._index.append(self._index_rows(old_length, len(self)))
+
+        for rollup in self._rollups.values():
+            rollup._add_encoded(days, codes, montants)
+
+        if self._totals is not None:
+            amounts = montants[expense]
+            by_code = codes[expense]
+            self._totals['count'] += np.bincount(by_code, minlength=nb_categories)
+            self._totals['sum'] += np.bincount(by_code, weights=amounts, minlength=nb_categories)
+            self._totals['sumsq'] += np.bincount(by_code, weights=amounts ** 2, minlength=nb_categories)
+
+    def _row_bounds(self, start, end):
+        """Lignes ``lo:hi`` des jours compris dans les bornes inclusives ``(start, end)``"""
+        first_day, last_day = day_bounds(start, end)
+        lo, hi = 0, len(self)
+        if first_day is not None:
+            lo = min(max(first_day - self.first_key, 0), len(self))
+        if last_day is not None:
+            hi = min(max(last_day - self.first_key + 1, 0), len(self))
+        return lo, max(lo, hi)
+
+    def slice(self, start=None, end=None):
+        """Sous-cube des jours compris dans les bornes inclusives ``(start, end)`` (vues, sans copie)"""
+        if start is None and end is None:
+            return self
+        lo, hi = self._row_bounds(start, end)
+        sub = DailyCategoryCube(self.categories, self.first_key + lo, 0, self.freq)
+        for field in CELL_FIELDS + FLOW_FIELDS:
+            setattr(sub, field, getattr(self, field)[lo:hi])
+        sub._index_owner = self._index_owner or self
+        return sub
+
+    def _index_rows(self, lo, hi):
+        """Lignes ``lo:hi`` à plat pour l'index : sommes, nombres et carrés par catégorie, puis flux"""
+        columns = [getattr(self, field)[lo:hi] for field in INDEX_FIELDS]
+        return np.hstack([values if values.ndim == 2 else values[:, None] for values in columns])
+
+    def _range_sum(self, lo, hi):
+        """Somme des lignes ``lo:hi`` lue dans l'index de sommes préfixes (construit au premier appel)"""
+        owner = self._index_owner or self
+        if owner._index is None:
+            owner._index = FenwickTree(owner._index_rows(0, len(owner)))
+        offset = self.first_key - owner.first_key
+        return owner._index.range_sum(offset + lo, offset + hi)
+
+    def range_totals(self, start=None, end=None):
+        """Comme ``category_totals``, restreint aux jours compris dans ``(start, end)``
+
+        Deux lectures de l'index de sommes préfixes, quel que soit le nombre
+        de jours de la fenêtre.
+        """
+        index, count, total, sumsq = self._range_cells(start, end)
+        return pd.DataFrame({'count': count, 'sum': total, 'sumsq': sumsq}, index=index)
+
+    def _range_cells(self, start, end):
+        """Catégories observées et leurs nombre, somme et somme des carrés sur ``(start, end)``"""
+        lo, hi = self._row_bounds(start, end)
+        totals = self._range_sum(lo, hi)
+        nb_categories = len(self.categories)
+        total, count, sumsq = (totals[i * nb_categories:(i + 1) * nb_categories]
+                               for i in range(len(CELL_FIELDS)))
+        count = np.rint(count).astype(np.int64)
+        observed = count > 0
+        index = pd.Index(np.asarray(self.categories, dtype=object)[observed], name='categorie')
+        return index, count[observed], total[observed], sumsq[observed]
+
+    def range_flows(self, start=None, end=None):
+        """Crédits, débits et nombres de transactions des jours compris dans ``(start, end)``"""
+        lo, hi = self._row_bounds(start, end)
+        totals = self._range_sum(lo, hi)[len(CELL_FIELDS) * len(self.categories):]
+        return {field: (value if field in ('credits', 'debits') else int(round(value)))
+                for field, value in zip(FLOW_FIELDS, totals)}
+
+    def rollup(self, freq):
+        """Cube hebdomadaire ('W') ou mensuel ('M') dérivé des jours, maintenu lors des ajouts"""
+        if freq == self.freq:
+            return self
+        rollup = self._rollups.get(freq)
+        if rollup is None:
+            rollup = DailyCategoryCube(self.categories, freq=freq)
+            if len(self):
+                # Jours consécutifs : chaque semaine ou mois est une plage contiguë
+                keys = bucket_keys(self.days, freq)
+                starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+                rollup.first_key = int(keys[0])
+                for field in CELL_FIELDS + FLOW_FIELDS:
+                    setattr(rollup, field, np.add.reduceat(getattr(self, field), starts, axis=0))
+            self._rollups[freq] = rollup
+        return rollup
+
+    def last_expense_date(self):
+        """Date de la dernière dépense (``None`` sans dépense)"""
+        active = np.flatnonzero(self.nb_debits)
+        if len(active) == 0:
+            return None
+        return self.dates[active[-1]]
+
+    def last_transaction_date(self):
+        """Date de la dernière transaction, revenus compris (``None`` sans transaction)"""
+        active = np.flatnonzero(self.nb_transactions)
+        if len(active) == 0:
+            return None
+        return self.dates[active[-1]]
+
+    def category_totals(self):
+        """Nombre, somme et somme des carrés par catégorie (catégories observées uniquement)"""
+        if self._totals is None:
+            self._totals = pd.DataFrame({
+                'count': self.counts.sum(axis=0),
+                'sum': self.sums.sum(axis=0),
+                'sumsq': self.sumsq.sum(axis=0)
+            }, index=pd.Index(self.categories, name='categorie'))
+        return self._totals[self._totals['count'] > 0].copy()
+
+    def category_stats(self):
+        """Nombre, somme, moyenne et écart-type (ddof=1) des dépenses par catégorie"""
+        totals = self.category_totals()
+        return self._stats(totals.index, totals['count'].to_numpy(), totals['sum'].to_numpy(),
+                           totals['sumsq'].to_numpy())
+
+    def range_stats(self, start=None, end=None):
+        """Comme ``category_stats``, restreint aux jours compris dans ``(start, end)`` (voir ``range_totals``)"""
+        return self._stats(*self._range_cells(start, end))
+
+    @staticmethod
+    def _stats(index, count, total, sumsq):
+        # Montants au centime : la somme arrondie au centime efface les écarts
+        # d'ordre de sommation (différences de préfixes), la moyenne est alors
+        # celle d'un ``groupby`` jusque dans les arrondis au demi-centime
+        total = np.round(total, 2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = total / count
+            variance = (sumsq - total * mean) / (count - 1)
+        std = np.where(count > 1, np.sqrt(np.clip(variance, 0, None)), np.nan)
+        return pd.DataFrame({'count': count, 'sum': total, 'mean': mean, 'std': std}, index=index)
+
+    def daily_expenses(self, dense=False):
+        """Dépenses quotidiennes (valeur absolue)
+
+        Par défaut, seuls les jours ayant au moins une dépense figurent (comme
+        un ``groupby`` sur la date). Avec ``dense=True``, tous les jours entre
+        la première et la dernière dépense sont présents, indexés par date.
+        """
+        active = np.flatnonzero(self.nb_debits)
+        if dense:
+            if len(active) == 0:
+                return pd.Series([], index=pd.DatetimeIndex([], name='date'), name='montant', dtype=float)
+            lo, hi = active[0], active[-1] + 1
+            return pd.Series(np.abs(self.debits[lo:hi]), index=self.dates[lo:hi], name='montant')
+        return pd.Series(np.abs(self.debits[active]),
+                         index=pd.Index(self.dates[active].date, name='date'), name='montant')
+
+    def period_expenses(self, freq):
+        """Dépenses (valeur absolue) par semaine ('W', fin dimanche) ou mois ('M', fin de mois)
+
+        Équivaut à ``resample(freq)`` des dépenses quotidiennes : toutes les
+        périodes entre la première et la dernière dépense figurent.
+        """
+        rollup = self.rollup(freq)
+        active = np.flatnonzero(rollup.nb_debits)
+        if len(active) == 0:
+            return pd.Series([], index=pd.DatetimeIndex([], name='date'), name='montant', dtype=float)
+        lo, hi = active[0], active[-1] + 1
+        index = self._period_index(rollup, lo, hi)
+        return pd.Series(np.abs(rollup.debits[lo:hi]), index=index, name='montant')
+
+    def category_period_matrix(self, freq):
+        """Matrice catégories × périodes ('W' ou 'M') des dépenses (valeur absolue)
+
+        Mêmes périodes que ``period_expenses`` : une ligne par catégorie
+        dépensée, une série temporelle complète par ligne.
+        """
+        rollup = self.rollup(freq)
+        active = np.flatnonzero(rollup.nb_debits)
+        observed = np.flatnonzero(rollup.counts.sum(axis=0))
+        if len(active) == 0:
+            return pd.DataFrame(index=pd.Index([], name='categorie'),
+                                columns=pd.DatetimeIndex([], name='date'), dtype=float)
+        lo, hi = active[0], active[-1] + 1
+        return pd.DataFrame(
+            np.abs(rollup.sums[lo:hi, observed]).T,
+            index=pd.Index([self.categories[i] for i in observed], name='categorie'),
+            columns=self._period_index(rollup, lo, hi)
+        )
+
+    @staticmethod
+    def _period_index(rollup, lo, hi):
+        """Dates de fin des périodes ``lo:hi`` d'un cumul hebdomadaire ou mensuel"""
+        first_key = int(rollup.first_key + lo)
+        if rollup.freq == 'W':
+            # Dimanche de chaque semaine
+            first_end = np.datetime64(first_key * 7 + 3, 'D')
+        else:
+            # Dernier jour de chaque mois
+            first_end = np.datetime64(first_key + 1, 'M').astype('datetime64[D]') - 1
+        return pd.date_range(first_end, periods=hi - lo, freq=rollup.freq, name='date')
+
+    def daily_category_matrix(self):
+        """Matrice jours × catégories des dépenses (valeur absolue), jours avec dépense catégorisée"""
+        totals = self.counts.sum(axis=0)
+        observed = np.flatnonzero(totals)
+        active = np.flatnonzero(self.counts.sum(axis=1))
+        matrix = np.abs(self.sums[np.ix_(active, observed)])
+        return pd.DataFrame(
+            matrix,
+            index=pd.Index(self.dates[active].date, name='date'),
+            columns=pd.Index([self.categories[i] for i in observed], name='categorie')
+        )
+
+    def monthly_by_category(self):
+        """Dépenses mensuelles par catégorie (valeur absolue), mois avec dépense catégorisée"""
+        months = self.rollup('M')
+        observed = np.flatnonzero(months.counts.sum(axis=0))
+        active = np.flatnonzero(months.counts.sum(axis=1))
+        periods = pd.PeriodIndex(
+            (months.first_key + active).astype('datetime64[M]'), freq='M', name='date'
+        )
+        return pd.DataFrame(
+            np.abs(months.sums[np.ix_(active, observed)]),
+            index=periods,
+            columns=pd.Index([self.categories[i] for i in observed], name='categorie')
+        )
+
+    def monthly_flows(self):
+        """Nombre de transactions, crédits et débits (signés) par mois, mois avec transaction"""
+        months = self.rollup('M')
+        keys = months.first_key + np.arange(len(months))
+        flows = pd.DataFrame({
+            'annee': 1970 + keys // 12,
+            'mois': keys % 12 + 1,
+            'nb_transactions': months.nb_transactions,
+            'credits': months.credits,
+            'debits': months.debits
+        })
+        return flows[flows['nb_transactions'] > 0].reset_index(drop=True)
+
+    def expenses_by(self, key):
+        """Nombre et somme (signée) des dépenses par jour de semaine (0 = lundi), mois ou trimestre"""
+        if key not in CALENDAR_KEYS:
+            raise ValueError(f"Regroupement inconnu: {key}")
+        dates = self.dates
+        if key == 'weekday':
+            groups = dates.dayofweek
+        elif key == 'month':
+            groups = dates.month
+        else:
+            groups = dates.quarter
+
+        grouped = pd.DataFrame({
+            'nb_transactions': self.nb_debits,
+            'total': self.debits
+        }, index=pd.Index(groups, name=key)).groupby(level=0).sum()
+        return grouped[grouped['nb_transactions'] > 0]
@@ -4,97 +4,281 @@ from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
-try:
-    from statsmodels.tsa.arima.model import ARIMA
-    from statsmodels.tsa.seasonal import seasonal_decompose
-    STATSMODELS_AVAILABLE = True
-except ImportError:
-    STATSMODELS_AVAILABLE = False
+from aggregates import DailyCategoryCube
+from forecasting import DEFAULT_SERIES_TIMEOUT_S, forecast, forecast_batch
+from model_cache import SHARED_MODEL_CACHE
+from online_stats import OnlineCategoryStats, RunningStats
+from quantile_sketch import QuantileSketches, TDigest
+from periods import PREDEFINED_PERIODS, date_slice, period_bounds
+from result_cache import SHARED_RESULT_CACHE, memoized
+from schema import to_standard
+
+# Colonnes couvertes par l'empreinte : une recatégorisation change la version
+VERSION_COLUMNS = ['date', 'montant', 'categorie', 'description']
+
+def dataset_version(df):
+    """Empreinte du contenu (dates, montants, catégories, descriptions) d'un jeu de transactions"""
+    columns = [column for column in VERSION_COLUMNS if column in df.columns]
+    hashes = pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+    return len(df), int(hashes.sum())
 
 class AnalysisEngine:
     """Moteur d'analyse pour l'assistant d'épargne"""
     
-    def __init__(self, df):
-        self.df = df.copy()
-        self.depenses_df = df[df['montant'] < 0].copy()
-        self.revenus_df = df[df['montant'] > 0].copy()
+    def __init__(self, df, cube=None, version=None, result_cache=None, model_cache=None):
+        # DataFrame de base partagé en lecture seule : jamais copié ni modifié.
+        # Les dépenses, revenus et périodes en sont dérivés à la demande, une
+        # seule fois par moteur
+        # Les DataFrames au schéma compact sont lus via leurs accesseurs date/montant
+        df = to_standard(df)
+        if not df['date'].is_monotonic_increasing:
+            # Tri unique : les filtres de période deviennent des tranches contiguës
+            df = df.sort_values('date', kind='stable')
+        self._frames = [df]
+        self._df = df
+        # Version du jeu de données : les résultats mémoïsés sont partagés
+        # entre tous les moteurs (et toutes les sessions) de même version
+        self.version = version if version is not None else dataset_version(df)
+        self.result_cache = result_cache if result_cache is not None else SHARED_RESULT_CACHE
+        # Modèles de prévision ajustés, persistés et indexés par série
+        self.model_cache = model_cache if model_cache is not None else SHARED_MODEL_CACHE
+        self._cube = cube
+        self._online_stats = None
+        self._category_sketches = None
+        self._daily_sketch = None
+        self._daily_stats = None
+        self._subsets = {}
+        self._period_engines = {}
+        self._date_indexes = {}
+    
+    @property
+    def df(self):
+        """DataFrame de base, trié par date (les lots ajoutés y sont concaténés à la demande)"""
+        if self._df is None:
+            df = pd.concat(self._frames, ignore_index=True)
+            if not df['date'].is_monotonic_increasing:
+                df = df.sort_values('date', kind='stable')
+            self._frames = [df]
+            self._df = df
+        return self._df
+    
+    def append_transactions(self, new_transactions, generator=None):
+        """Ajoute un lot de transactions et met à jour les agrégats en place
+        
+        Seuls les jours, semaines, mois et catégories touchés par le lot sont
+        recalculés dans le cube ; le DataFrame de base n'est reconstitué que
+        si une analyse a besoin des transactions brutes. Retourne la nouvelle
+        version du jeu de données.
+        """
+        batch = to_standard(new_transactions)
+        if batch.empty:
+            return self.version
+        if 'categorie' not in batch.columns:
+            if generator is None:
+                from data_generator import DataGenerator
+                generator = DataGenerator()
+            batch = generator.process_data(batch.copy())
+        
+        # Le cube de la version courante reste partagé tel quel : le lot est
+        # cumulé dans une copie (quelques milliers de cellules)
+        last_expense_date = self.cube.last_expense_date()
+        cube = self.cube.copy()
+        cube.add_transactions(batch)
+        online_stats = self.online_stats.copy()
+        online_stats.update_frame(batch)
+        category_sketches = self.category_sketches.copy()
+        category_sketches.update_frame(batch)
+        
+        # Dépenses quotidiennes : seuls les jours postérieurs à la dernière
+        # dépense connue sont nouveaux, sinon l'esquisse et les statistiques
+        # quotidiennes sont reconstruites
+        daily_sketch = daily_stats = None
+        batch_expense_dates = batch.loc[batch['montant'].to_numpy() < 0, 'date']
+        if last_expense_date is not None and (batch_expense_dates.empty
+                                              or batch_expense_dates.min() >= last_expense_date + timedelta(days=1)):
+            new_days = cube.slice(last_expense_date + timedelta(days=1), None).daily_expenses().to_numpy()
+            daily_sketch = self.daily_spending_sketch.copy()
+            daily_sketch.update_many(new_days)
+            daily_stats = self.daily_spending_stats.copy().merge(RunningStats.from_values(new_days))
+        
+        self.version = (self.version, 'append', dataset_version(batch))
+        self._cube = self.result_cache.get_or_compute((self.version, 'cube'), lambda: cube)
+        self._online_stats = self.result_cache.get_or_compute((self.version, 'online_stats'),
+                                                              lambda: online_stats)
+        self._category_sketches = self.result_cache.get_or_compute((self.version, 'category_sketches'),
+                                                                   lambda: category_sketches)
+        self._daily_sketch = self._daily_stats = None
+        if daily_sketch is not None:
+            self._daily_sketch = self.result_cache.get_or_compute((self.version, 'daily_sketch'),
+                                                                  lambda: daily_sketch)
+            self._daily_stats = self.result_cache.get_or_compute((self.version, 'daily_stats'),
+                                                                 lambda: daily_stats)
+        self._frames.append(batch)
+        self._df = None
+        self._subsets = {}
+        self._period_engines = {}
+        self._date_indexes = {}
+        return self.version
+    
+    def _date_index(self, df):
+        """Dates triées (``datetime64``) d'un DataFrame du moteur (``None`` si non trié)"""
+        cached = self._date_indexes.get(id(df))
+        if cached is not None and cached[0] is df:
+            return cached[1]
+        
+        dates = df['date'].to_numpy() if df['date'].is_monotonic_increasing else None
+        # Seuls le DataFrame de base et ses sous-ensembles sont indexés
+        if df is self.df or any(df is subset for subset in self._subsets.values()):
+            self._date_indexes[id(df)] = (df, dates)
+        return dates
+    
+    def _subset(self, name, select):
+        """Sous-ensemble de lignes du DataFrame de base, mis en cache"""
+        subset = self._subsets.get(name)
+        if subset is None:
+            subset = self.df[select(self.df['montant'].to_numpy())]
+            self._subsets[name] = subset
+        return subset
+    
+    @property
+    def cube(self):
+        """Agrégat jour × catégorie, construit une seule fois par version du jeu de données"""
+        if self._cube is None:
+            self._cube = self.result_cache.get_or_compute(
+                (self.version, 'cube'), lambda: DailyCategoryCube.from_transactions(self.df)
+            )
+        return self._cube
+    
+    @property
+    def online_stats(self):
+        """Statistiques en ligne des dépenses par catégorie et jour de semaine, mises à jour par les ajouts"""
+        if self._online_stats is None:
+            self._online_stats = self.result_cache.get_or_compute(
+                (self.version, 'online_stats'), lambda: OnlineCategoryStats.from_transactions(self.df)
+            )
+        return self._online_stats
+    
+    @property
+    def category_sketches(self):
+        """Esquisses de quantiles (t-digest) des montants de dépense par catégorie"""
+        if self._category_sketches is None:
+            self._category_sketches = self.result_cache.get_or_compute(
+                (self.version, 'category_sketches'), lambda: QuantileSketches.from_transactions(self.df)
+            )
+        return self._category_sketches
+    
+    @property
+    def daily_spending_sketch(self):
+        """Esquisse de quantiles (t-digest) des dépenses quotidiennes, prolongée par les ajouts de jours"""
+        if self._daily_sketch is None:
+            def build():
+                sketch = TDigest()
+                sketch.update_many(self.cube.daily_expenses().to_numpy())
+                return sketch
+            self._daily_sketch = self.result_cache.get_or_compute((self.version, 'daily_sketch'), build)
+        return self._daily_sketch
+    
+    @property
+    def daily_spending_stats(self):
+        """Nombre, moyenne et écart-type des dépenses quotidiennes (jours avec dépense), prolongés par les ajouts de jours"""
+        if self._daily_stats is None:
+            self._daily_stats = self.result_cache.get_or_compute(
+                (self.version, 'daily_stats'), lambda: RunningStats.from_values(self.cube.daily_expenses())
+            )
+        return self._daily_stats
+    
+    @property
+    def depenses_df(self):
+        """Transactions de dépense (montant négatif)"""
+        return self._subset('depenses', lambda montants: montants < 0)
+    
+    @property
+    def revenus_df(self):
+        """Transactions de revenu (montant positif)"""
+        return self._subset('revenus', lambda montants: montants > 0)
+    
+    def for_period(self, period='all', date_range=None):
+        """Moteur restreint à une période, partageant le DataFrame de base"""
+        if period == 'all' or (period == 'custom' and date_range is None):
+            return self
+        
+        key = (period, tuple(date_range) if date_range is not None else None)
+        engine = self._period_engines.get(key)
+        if engine is None:
+            start, end = self._period_bounds(self.df, period, date_range)
+            engine = AnalysisEngine(self._apply_period_filter(self.df, period, date_range),
+                                    cube=self.cube.slice(start, end),
+                                    version=(self.version, key),
+                                    result_cache=self.result_cache,
+                                    model_cache=self.model_cache)
+            self._period_engines[key] = engine
+        return engine
+    
+    def _period_bounds(self, df, period='all', date_range=None, dates=None):
+        """Bornes inclusives d'une période, relatives à la date la plus récente de ``df``"""
+        current_date = None
+        if period not in ('all', 'custom') and not df.empty:
+            current_date = dates[-1] if dates is not None else df['date'].max()
+        return period_bounds(period, current_date, date_range)
     
     def _apply_period_filter(self, df, period='all', date_range=None):
-        """Applique le filtre de période à un DataFrame"""
-        df_filtered = df.copy()
-        
-        if date_range is not None and period == 'custom':
-            # Filtre par dates personnalisées
-            start_date, end_date = date_range
-            df_filtered = df_filtered[
-                (df_filtered['date'].dt.date >= start_date) & 
-                (df_filtered['date'].dt.date <= end_date)
-            ]
-        elif period != 'all':
-            current_date = df_filtered['date'].max()
-            
-            if period == 'current_month':
-                start_of_month = current_date.replace(day=1)
-                df_filtered = df_filtered[df_filtered['date'] >= start_of_month]
-            elif period == 'last_month':
-                # Mois précédent complet
-                start_of_current = current_date.replace(day=1)
-                end_of_last = start_of_current - timedelta(days=1)
-                start_of_last = end_of_last.replace(day=1)
-                df_filtered = df_filtered[
-                    (df_filtered['date'] >= start_of_last) & 
-                    (df_filtered['date'] <= end_of_last)
-                ]
-            elif period == 'last_3months':
-                three_months_ago = current_date - timedelta(days=90)
-                df_filtered = df_filtered[df_filtered['date'] >= three_months_ago]
-            elif period == 'last_6months':
-                six_months_ago = current_date - timedelta(days=180)
-                df_filtered = df_filtered[df_filtered['date'] >= six_months_ago]
-            elif period == 'current_year':
-                start_of_year = current_date.replace(month=1, day=1)
-                df_filtered = df_filtered[df_filtered['date'] >= start_of_year]
-            elif period == 'last_year':
-                last_year = current_date.year - 1
-                start_of_last_year = current_date.replace(year=last_year, month=1, day=1)
-                end_of_last_year = current_date.replace(year=last_year, month=12, day=31)
-                df_filtered = df_filtered[
-                    (df_filtered['date'] >= start_of_last_year) & 
-                    (df_filtered['date'] <= end_of_last_year)
-                ]
-            elif period == 'last_12months':
-                twelve_months_ago = current_date - timedelta(days=365)
-                df_filtered = df_filtered[df_filtered['date'] >= twelve_months_ago]
-        
-        return df_filtered
+        """Applique le filtre de période à un DataFrame (tranche sans copie si trié par date)"""
+        if df.empty:
+            return df
+        
+        dates = self._date_index(df)
+        start, end = self._period_bounds(df, period, date_range, dates)
         
+        if start is None and end is None:
+            return df
+        
+        if dates is not None:
+            # Recherche dichotomique sur les dates triées, bornes exactes
+            lo, hi = date_slice(dates, start, end)
+            return df.iloc[lo:hi]
+        
+        mask = np.ones(len(df), dtype=bool)
+        if start is not None:
+            mask &= (df['date'] >= start).to_numpy()
+        if end is not None:
+            mask &= (df['date'] <= end).to_numpy()
+        
+        return df[mask]
+        
+    @memoized
     def get_monthly_summary(self):
         """Résumé mensuel des finances"""
-        monthly = self.df.groupby(['annee', 'mois']).agg({
-            'montant': ['sum', 'count']
-        }).round(2)
+        # Une seule agrégation mensuelle des flux quotidiens du cube,
+        # crédits et débits séparés selon le signe du montant
+        flows = self.cube.monthly_flows()
         
-        monthly.columns = ['total', 'nb_transactions']
-        monthly = monthly.reset_index()
-        monthly['periode'] = monthly.apply(lambda x: f"{int(x['annee'])}-{int(x['mois']):02d}", axis=1)
+        monthly = pd.DataFrame({
+            'annee': flows['annee'],
+            'mois': flows['mois'],
+            'total': (flows['credits'] + flows['debits']).round(2),
+            'nb_transactions': flows['nb_transactions']
+        })
+        monthly['periode'] = monthly['annee'].astype(str) + '-' + monthly['mois'].astype(str).str.zfill(2)
         
         # Séparation revenus/dépenses par mois
-        monthly_income = self.revenus_df.groupby(['annee', 'mois'])['montant'].sum()
-        monthly_expenses = self.depenses_df.groupby(['annee', 'mois'])['montant'].sum().abs()
-        
-        monthly['revenus'] = monthly.apply(lambda x: monthly_income.get((x['annee'], x['mois']), 0), axis=1)
-        monthly['depenses'] = monthly.apply(lambda x: monthly_expenses.get((x['annee'], x['mois']), 0), axis=1)
+        monthly['revenus'] = flows['credits']
+        monthly['depenses'] = flows['debits'].abs()
         monthly['solde'] = monthly['revenus'] - monthly['depenses']
         
         return monthly
     
+    @memoized
     def get_category_analysis(self, period='all', date_range=None):
         """Analyse par catégorie"""
-        df_filtered = self._apply_period_filter(self.depenses_df, period, date_range)
-        
-        category_stats = df_filtered.groupby('categorie').agg({
-            'montant': ['count', 'sum', 'mean', 'std']
-        }).round(2)
+        # Période relative à la dernière dépense : deux lectures de l'index de
+        # sommes préfixes du cube, quelle que soit la longueur de la fenêtre
+        start, end = period_bounds(period, self.cube.last_expense_date(), date_range)
+        category_stats = self.cube.range_stats(start, end)[['count', 'sum', 'mean', 'std']]
+        # Moyenne arrondie sur les centimes entiers : un demi-centime est
+        # arrondi au centime pair, indépendamment de l'ordre de sommation
+        sum_cents = np.round(category_stats['sum'].to_numpy() * 100)
+        category_stats['mean'] = np.round(sum_cents / category_stats['count'].to_numpy()) / 100
+        category_stats = category_stats.round(2)
         
         category_stats.columns = ['nb_transactions', 'total_depense', 'moyenne', 'ecart_type']
         category_stats['total_depense'] = category_stats['total_depense'].abs()
@@ -106,19 +290,65 @@ class AnalysisEngine:
         
         return category_stats
     
+    @memoized
+    def get_all_periods_summary(self):
+        """Agrégats clés de chaque période prédéfinie (``periods.PREDEFINED_PERIODS``)
+        
+        Une seule passe sur les transactions triées construit le cube ;
+        chaque période est ensuite lue dans son index de sommes préfixes.
+        Les périodes sont relatives à la dernière transaction, au jour près.
+        """
+        current_date = self.cube.last_transaction_date()
+        return {
+            period: self._period_summary(*period_bounds(period, current_date))
+            for period in PREDEFINED_PERIODS
+        }
+    
+    @memoized
+    def get_period_summary(self, period='all', date_range=None):
+        """Agrégats clés d'une période : lecture du résumé de toutes les périodes prédéfinies,
+        ou deux lectures de l'index de sommes préfixes pour une période personnalisée"""
+        if period in PREDEFINED_PERIODS:
+            return self.get_all_periods_summary()[period]
+        start, end = period_bounds(period, self.cube.last_transaction_date(), date_range)
+        return self._period_summary(start, end)
+    
+    def _period_summary(self, start, end):
+        """Nombres de transactions, totaux et répartition par catégorie des jours compris dans ``(start, end)``"""
+        flows = self.cube.range_flows(start, end)
+        totals = self.cube.range_totals(start, end)
+        
+        categories = pd.DataFrame({
+            'nb_transactions': totals['count'],
+            'total_depense': totals['sum'].abs().round(2)
+        }).sort_values('total_depense', ascending=False)
+        total_depenses = abs(flows['debits'])
+        categories['pourcentage'] = (categories['total_depense'] / total_depenses * 100).round(1) \
+            if total_depenses else 0.0
+        
+        return {
+            'debut': start,
+            'fin': end,
+            'nb_transactions': flows['nb_transactions'],
+            'nb_depenses': flows['nb_debits'],
+            'nb_revenus': flows['nb_credits'],
+            'total_depenses': total_depenses,
+            'total_revenus': flows['credits'],
+            'solde': flows['credits'] + flows['debits'],
+            'categories': categories
+        }
+    
+    @memoized
     def get_spending_trends(self):
         """Analyse des tendances de dépenses"""
-        # Dépenses par semaine
-        weekly_spending = self.depenses_df.set_index('date').resample('W')['montant'].sum().abs()
+        # Dépenses par semaine (cumuls hebdomadaires du cube)
+        weekly_spending = self.cube.period_expenses('W')
         
         # Dépenses par mois
-        monthly_spending = self.depenses_df.set_index('date').resample('M')['montant'].sum().abs()
+        monthly_spending = self.cube.period_expenses('M')
         
         # Top catégories par mois
-        monthly_by_category = self.depenses_df.groupby([
-            self.depenses_df['date'].dt.to_period('M'), 
-            'categorie'
-        ])['montant'].sum().abs().unstack(fill_value=0)
+        monthly_by_category = self.cube.monthly_by_category()
         
         return {
             'weekly': weekly_spending,
@@ -126,11 +356,22 @@ class AnalysisEngine:
             'monthly_by_category': monthly_by_category
         }
     
-    def predict_future_spending(self, periods=4):
-        """Prédiction des dépenses futures"""
+    @memoized
+    def predict_future_spending(self, periods=4, method='auto', latency_budget_ms=None):
+        """Prédiction des dépenses futures
+        
+        ``method`` : 'auto', 'arima', 'holt_winters', 'holt' ou
+        'moving_average' (voir ``forecasting.forecast``). En mode 'auto',
+        le choix d'origine est conservé sans budget de latence (ARIMA à
+        partir de 20 semaines, moyenne mobile en deçà) ; avec un budget, la
+        méthode la plus précise qui le respecte est choisie. Les modèles
+        ajustés sont réutilisés via ``model_cache`` : une série inchangée ne
+        coûte qu'une recherche en cache, une semaine de plus un ajustement
+        repris à chaud.
+        """
         try:
             # Agrégation par semaine pour avoir suffisamment de points
-            weekly_spending = self.depenses_df.set_index('date').resample('W')['montant'].sum().abs()
+            weekly_spending = self.cube.period_expenses('W')
             
             if len(weekly_spending) < 10:
                 return {
@@ -139,28 +380,19 @@ class AnalysisEngine:
                     'predictions': None
                 }
             
-            # Méthode simple: moyenne mobile
             recent_avg = weekly_spending.tail(8).mean()  # Moyenne des 8 dernières semaines
             trend = (weekly_spending.tail(4).mean() - weekly_spending.head(4).mean()) / len(weekly_spending)
             
-            predictions = []
-            for i in range(1, periods + 1):
-                pred_value = recent_avg + (trend * i)
-                predictions.append(max(pred_value, 0))  # Pas de dépenses négatives
-            
-            # Si statsmodels est disponible, utiliser ARIMA
-            if STATSMODELS_AVAILABLE and len(weekly_spending) >= 20:
-                try:
-                    model = ARIMA(weekly_spending.values, order=(1,1,1))
-                    fitted_model = model.fit()
-                    arima_pred = fitted_model.forecast(steps=periods)
-                    predictions = [max(x, 0) for x in arima_pred]
-                except:
-                    pass  # Garder les prédictions simples
+            result = forecast(weekly_spending.values, periods, method, latency_budget_ms,
+                              model_cache=self.model_cache)
             
             return {
                 'success': True,
-                'predictions': predictions,
+                'predictions': result['predictions'],
+                'lower': result['lower'],
+                'upper': result['upper'],
+                'method': result['method'],
+                'fit': result['fit'],
                 'current_avg': recent_avg,
                 'trend': 'croissante' if trend > 0 else 'décroissante',
                 'confidence': 'élevée' if len(weekly_spending) >= 20 else 'modérée'
@@ -173,15 +405,49 @@ class AnalysisEngine:
                 'predictions': None
             }
     
-    def identify_savings_opportunities(self):
-        """Identification des opportunités d'économies"""
+    @memoized
+    def predict_category_spending(self, periods=4, method='auto', latency_budget_ms=None,
+                                  max_workers=None, timeout_s=DEFAULT_SERIES_TIMEOUT_S):
+        """Prédiction des dépenses hebdomadaires de chaque catégorie
+        
+        Les séries catégories × semaines du cube sont ajustées en parallèle
+        (``forecasting.forecast_batch``) : ``max_workers`` processus, chaque
+        série bornée par ``timeout_s`` secondes avant repli sur une méthode
+        plus rapide.
+        """
+        weekly_by_category = self.cube.category_period_matrix('W')
+        if weekly_by_category.shape[1] < 10:
+            return {
+                'success': False,
+                'message': 'Pas assez de données pour une prédiction fiable',
+                'predictions': None
+            }
+        
+        forecasts = forecast_batch(weekly_by_category, periods, method, latency_budget_ms,
+                                   max_workers=max_workers, timeout_s=timeout_s)
+        return {
+            'success': True,
+            'predictions': {category: result for category, result in forecasts.items() if result['success']},
+            'failed': {category: result['message'] for category, result in forecasts.items()
+                       if not result['success']}
+        }
+    
+    @memoized
+    def identify_savings_opportunities(self, outlier_method='std', top_k=10):
+        """Identification des opportunités d'économies
+        
+        ``outlier_method`` choisit les statistiques des dépenses inhabituelles :
+        'std' (moyenne + 2 écarts-types) ou 'mad' (médiane + 2 écarts absolus
+        médians normalisés, robuste aux valeurs extrêmes).
+        """
         opportunities = {}
         
         # 1. Catégories "compressibles"
         compressible_categories = ['Restaurants', 'Loisirs', 'Shopping']
-        compressible_spending = self.depenses_df[
-            self.depenses_df['categorie'].isin(compressible_categories)
-        ].groupby('categorie')['montant'].sum().abs()
+        category_totals = self.cube.category_totals()
+        compressible_spending = category_totals.loc[
+            category_totals.index.isin(compressible_categories), 'sum'
+        ].abs().rename('montant')
         
         total_compressible = compressible_spending.sum()
         opportunities['depenses_compressibles'] = {
@@ -194,7 +460,7 @@ class AnalysisEngine:
         # 2. Détection des abonnements
         abonnements = self.depenses_df[self.depenses_df['categorie'] == 'Abonnements']
         if not abonnements.empty:
-            monthly_subscriptions = abonnements.groupby('description')['montant'].agg(['count', 'mean'])
+            monthly_subscriptions = abonnements.groupby('description', observed=True)['montant'].agg(['count', 'mean'])
             monthly_subscriptions['mean'] = monthly_subscriptions['mean'].abs()
             monthly_subscriptions = monthly_subscriptions[monthly_subscriptions['count'] >= 2]  # Au moins 2 occurrences
             
@@ -209,28 +475,14 @@ class AnalysisEngine:
             }
         
         # 3. Dépenses inhabituelles (outliers)
-        unusual_expenses = []
-        for category in self.depenses_df['categorie'].unique():
-            cat_data = self.depenses_df[self.depenses_df['categorie'] == category]['montant'].abs()
-            if len(cat_data) > 5:
-                threshold = cat_data.mean() + 2 * cat_data.std()
-                outliers = self.depenses_df[
-                    (self.depenses_df['categorie'] == category) & 
-                    (self.depenses_df['montant'].abs() > threshold)
-                ]
-                if not outliers.empty:
-                    unusual_expenses.extend(outliers.to_dict('records'))
-        
-        opportunities['depenses_inhabituelles'] = unusual_expenses[:10]  # Top 10
+        opportunities['depenses_inhabituelles'] = self._find_unusual_expenses(outlier_method, top_k)
         
         # 4. Analyse des habitudes de week-end vs semaine
-        weekend_spending = abs(self.depenses_df[
-            self.depenses_df['jour_semaine'].isin(['Saturday', 'Sunday'])
-        ]['montant'].sum())
+        by_weekday = self.cube.expenses_by('weekday')['total']
+        weekend = by_weekday.index >= 5  # Samedi et dimanche
+        weekend_spending = abs(by_weekday[weekend].sum())
         
-        weekday_spending = abs(self.depenses_df[
-            ~self.depenses_df['jour_semaine'].isin(['Saturday', 'Sunday'])
-        ]['montant'].sum())
+        weekday_spending = abs(by_weekday[~weekend].sum())
         
         opportunities['repartition_semaine'] = {
             'weekend': weekend_spending,
@@ -240,6 +492,62 @@ class AnalysisEngine:
         
         return opportunities
     
+    def _find_unusual_expenses(self, method='std', top_k=10, n_sigma=2):
+        """Les ``top_k`` dépenses les plus au-dessus du seuil de leur catégorie
+        
+        Méthode 'std' : moyenne et écart-type lus dans les statistiques en
+        ligne (``online_stats``), sans repasser sur l'historique. Méthode
+        'mad' : médianes calculées en une passe groupée ; une catégorie
+        d'écart absolu médian nul utilise le seuil 'std'. Seules les
+        catégories de plus de 5 dépenses sont considérées. Les dépenses retenues sont
+        triées par dépassement du seuil décroissant.
+        """
+        if method not in ('std', 'mad'):
+            raise ValueError(f"Méthode de détection inconnue: {method}")
+        
+        depenses = self.depenses_df
+        if depenses.empty or top_k <= 0:
+            return []
+        
+        montants = depenses['montant'].abs().to_numpy()
+        if method == 'mad':
+            by_category = depenses['montant'].abs().groupby(depenses['categorie'], observed=True, sort=False)
+            center = by_category.transform('median').to_numpy()
+            # Écart absolu médian, normalisé pour estimer l'écart-type d'une loi normale
+            deviation = pd.Series(np.abs(montants - center), index=depenses.index)
+            scale = deviation.groupby(depenses['categorie'], observed=True, sort=False).transform('median').to_numpy() * 1.4826
+            size = by_category.transform('size').to_numpy()
+            # Écart absolu médian nul (abonnement au même prix chaque mois) :
+            # le seuil de la catégorie retombe sur moyenne + n_sigma écarts-types
+            constant = scale == 0
+            if constant.any():
+                stats = self.online_stats.category_frame().reindex(
+                    depenses['categorie'].astype(object).to_numpy()[constant]
+                )
+                center[constant] = stats['mean'].to_numpy()
+                scale[constant] = stats['std'].to_numpy()
+        else:
+            # Statistiques par catégorie alignées sur chaque dépense
+            stats = self.online_stats.category_frame().reindex(depenses['categorie'].astype(object).to_numpy())
+            center = stats['mean'].to_numpy()
+            scale = stats['std'].to_numpy()
+            size = stats['count'].to_numpy()
+        
+        with np.errstate(invalid='ignore'):
+            excess = montants - (center + n_sigma * scale)
+            # Une dispersion inférieure au demi-centime signifie des montants
+            # identiques : aucun dépassement n'est alors significatif
+            flagged = (size > 5) & (scale >= 0.005) & (excess > 0)
+        candidates = np.flatnonzero(flagged)
+        
+        # Sélection partielle des k plus forts dépassements, sans trier toute la liste
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-excess[candidates], top_k - 1)[:top_k]]
+        candidates = candidates[np.argsort(-excess[candidates], kind='stable')]
+        
+        return depenses.iloc[candidates].to_dict('records')
+    
+    @memoized
     def get_financial_health_score(self):
         """Calcul d'un score de santé financière"""
         monthly_summary = self.get_monthly_summary()
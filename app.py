@@ -9,6 +9,11 @@ from data_generator import DataGenerator
 from analysis_engine import AnalysisEngine
 from visualization import VisualizationEngine
 from advanced_features import integrate_advanced_features
+from storage import PYARROW_AVAILABLE, TransactionStore
+from loader_cache import LoaderCache, file_fingerprint
+
+# Budget de latence des prédictions : ARIMA n'est retenu que s'il tient dans ce délai
+PREDICTION_LATENCY_BUDGET_MS = 200
 
 # Configuration de la page
 st.set_page_config(
@@ -108,6 +113,11 @@ def main():
             generate_new_data()
             st.rerun()
         
+        # Ajout incrémental d'un mois à la suite de l'historique
+        if st.button("➕ Ajouter un Mois de Transactions"):
+            if append_new_month():
+                st.rerun()
+        
         # Filtre de période amélioré
         st.subheader("📅 Période d'Analyse")
         
@@ -183,27 +193,26 @@ def main():
     # Chargement des données
     df = load_or_generate_data()
     
-    # Affichage des statistiques de la période sélectionnée dans la sidebar
+    # Moteur d'analyse unique : les vues par période partagent son DataFrame de base.
+    # L'empreinte du fichier source sert de version aux résultats mémoïsés
+    analyzer = None
     if df is not None and not df.empty:
-        analyzer_temp = AnalysisEngine(df)
-        if period_filter == 'custom' and date_range:
-            filtered_df = analyzer_temp._apply_period_filter(df, period_filter, date_range)
-            st.sidebar.markdown("---")
-            st.sidebar.markdown("📊 **Statistiques de la période**")
-            st.sidebar.write(f"• Transactions: {len(filtered_df)}")
-            st.sidebar.write(f"• Dépenses: {len(filtered_df[filtered_df['montant'] < 0])}")
-            st.sidebar.write(f"• Revenus: {len(filtered_df[filtered_df['montant'] > 0])}")
-        elif period_filter != 'all':
-            filtered_df = analyzer_temp._apply_period_filter(df, period_filter, date_range)
+        analyzer = AnalysisEngine(df, version=get_loader_cache().key_for(df))
+    
+    # Affichage des statistiques de la période sélectionnée dans la sidebar
+    if analyzer is not None:
+        if period_filter != 'all':
+            # Toutes les périodes prédéfinies sont résumées en une passe et mises
+            # en cache : changer de période n'est qu'une lecture
+            period_summary = analyzer.get_period_summary(period_filter, date_range)
             st.sidebar.markdown("---")
             st.sidebar.markdown("📊 **Statistiques de la période**")
-            st.sidebar.write(f"• Transactions: {len(filtered_df)}")
-            st.sidebar.write(f"• Dépenses: {len(filtered_df[filtered_df['montant'] < 0])}")
-            st.sidebar.write(f"• Revenus: {len(filtered_df[filtered_df['montant'] > 0])}")
+            st.sidebar.write(f"• Transactions: {period_summary['nb_transactions']}")
+            st.sidebar.write(f"• Dépenses: {period_summary['nb_depenses']}")
+            st.sidebar.write(f"• Revenus: {period_summary['nb_revenus']}")
     
-    if df is not None and not df.empty:
-        # Création des moteurs d'analyse et de visualisation
-        analyzer = AnalysisEngine(df)
+    if analyzer is not None:
+        # Création du moteur de visualisation
         visualizer = VisualizationEngine()
         
         # Navigation par onglets
@@ -237,27 +246,64 @@ def main():
     else:
         st.error("❌ Impossible de charger les données. Veuillez générer de nouvelles données.")
 
-@st.cache_data
+def store_is_fresh(store, filename='releve_bancaire_fictif.csv'):
+    """Le stockage colonnaire existe et est au moins aussi récent que le CSV"""
+    return store.exists() and (
+        not os.path.exists(filename)
+        or os.path.getmtime(store.manifest_path) >= os.path.getmtime(filename)
+    )
+
+@st.cache_resource
+def get_loader_cache():
+    """Cache de chargement partagé par toutes les sessions"""
+    return LoaderCache(ttl=None, max_entries=2)
+
 def load_or_generate_data():
-    """Charge les données existantes ou en génère de nouvelles"""
+    """Charge les données existantes ou en génère de nouvelles
+    
+    Le DataFrame est mis en cache selon l'empreinte (chemin, taille, date,
+    contenu) du fichier source : toute modification sur disque est prise en
+    compte, et les sessions partagent le même DataFrame en lecture seule.
+    """
     filename = 'releve_bancaire_fictif.csv'
     
+    store = TransactionStore()
+    cache = get_loader_cache()
+    
+    # Jeu de données colonnaire prioritaire s'il est au moins aussi récent que le CSV
+    fresh = store_is_fresh(store, filename)
+    if PYARROW_AVAILABLE and fresh:
+        try:
+            return cache.get_or_load(('store',) + file_fingerprint(store.manifest_path), store.load)
+        except Exception as e:
+            st.warning(f"Erreur lors du chargement du stockage colonnaire: {e}")
+    
     if os.path.exists(filename):
         try:
-            df = pd.read_csv(filename)
-            if 'categorie' not in df.columns:
-                # Retraitement nécessaire
-                generator = DataGenerator()
-                df = generator.process_data(df)
-            else:
-                df['date'] = pd.to_datetime(df['date'])
-            return df
+            return cache.get_or_load(
+                ('csv',) + file_fingerprint(filename),
+                lambda: read_csv_data(filename, store, fresh)
+            )
         except Exception as e:
             st.warning(f"Erreur lors du chargement: {e}")
             return generate_new_data()
     else:
         return generate_new_data()
 
+def read_csv_data(filename, store, fresh):
+    """Lit le relevé CSV et le convertit au format colonnaire si nécessaire"""
+    df = pd.read_csv(filename)
+    if 'categorie' not in df.columns:
+        # Retraitement nécessaire
+        generator = DataGenerator()
+        df = generator.process_data(df)
+    else:
+        df['date'] = pd.to_datetime(df['date'])
+    if PYARROW_AVAILABLE and not fresh:
+        # Conversion unique : les démarrages suivants liront le format colonnaire
+        store.write(df)
+    return df
+
 def generate_new_data():
     """Génère un nouveau jeu de données"""
     with st.spinner("🔄 Génération de nouvelles données..."):
@@ -265,9 +311,30 @@ def generate_new_data():
         df = generator.generate_transactions(nb_transactions=600)
         df = generator.process_data(df)
         generator.save_to_csv(df)
+        if PYARROW_AVAILABLE:
+            TransactionStore().write(df)
         st.success("✅ Nouvelles données générées avec succès!")
         return df
 
+def append_new_month():
+    """Ajoute un mois de transactions fictives à la suite de l'historique existant"""
+    store = TransactionStore()
+    if not (PYARROW_AVAILABLE and store.exists()):
+        st.warning("⚠️ L'ajout incrémental nécessite le stockage colonnaire (pyarrow)")
+        return False
+    
+    with st.spinner("➕ Ajout d'un mois de transactions..."):
+        start_date = (store.date_max() + timedelta(days=1)).to_pydatetime()
+        end_date = (start_date + pd.DateOffset(months=1) - timedelta(days=1)).to_pydatetime()
+        
+        generator = DataGenerator()
+        new_transactions = generator.generate_transactions(
+            nb_transactions=50, start_date=start_date, end_date=end_date, vectorized=True
+        )
+        version = store.append(new_transactions, generator)
+        st.success(f"✅ {len(new_transactions)} transactions ajoutées (version {version})")
+        return True
+
 def display_overview(analyzer, visualizer, period_filter, date_range):
     """Affiche la vue d'ensemble"""
     st.header("📊 Vue d'Ensemble Financière")
@@ -390,7 +457,9 @@ def display_predictions(analyzer, visualizer, period_filter, date_range):
     if period_filter != 'all':
         st.info("🔍 Les prédictions sont basées sur l'ensemble des données historiques pour plus de précision.")
     
-    prediction_result = analyzer.predict_future_spending(periods=4)
+    prediction_result = analyzer.predict_future_spending(
+        periods=4, latency_budget_ms=PREDICTION_LATENCY_BUDGET_MS
+    )
     
     if prediction_result['success']:
         # Informations sur la prédiction
@@ -433,9 +502,34 @@ def display_predictions(analyzer, visualizer, period_filter, date_range):
         st.subheader("📋 Prédictions Détaillées")
         predictions_df = pd.DataFrame({
             'Semaine': [f"Semaine +{i+1}" for i in range(len(prediction_result['predictions']))],
-            'Dépenses Prédites (€)': [f"{pred:.2f}" for pred in prediction_result['predictions']]
+            'Dépenses Prédites (€)': [f"{pred:.2f}" for pred in prediction_result['predictions']],
+            'Intervalle 95% (€)': [
+                f"{low:.2f} - {high:.2f}"
+                for low, high in zip(prediction_result['lower'], prediction_result['upper'])
+            ]
         })
         st.dataframe(predictions_df, use_container_width=True)
+        fit_labels = {'cache': 'modèle en cache', 'warm': 'ajustement repris à chaud', 'full': 'ajustement complet'}
+        st.caption(f"Méthode de prévision : {prediction_result['method']} "
+                   f"({fit_labels[prediction_result['fit']]})")
+        
+        # Prédictions par catégorie, ajustées en parallèle
+        category_result = analyzer.predict_category_spending(
+            periods=4, latency_budget_ms=PREDICTION_LATENCY_BUDGET_MS
+        )
+        if category_result['success'] and category_result['predictions']:
+            st.subheader("🏷️ Prédictions par Catégorie")
+            category_df = pd.DataFrame([
+                {
+                    'Catégorie': category,
+                    'Dépenses Prédites 4 Semaines (€)': f"{sum(result['predictions']):.2f}",
+                    'Semaine +1 (€)': f"{result['predictions'][0]:.2f}",
+                    'Intervalle 95% Semaine +1 (€)': f"{result['lower'][0]:.2f} - {result['upper'][0]:.2f}",
+                    'Méthode': result['method']
+                }
+                for category, result in category_result['predictions'].items()
+            ])
+            st.dataframe(category_df, use_container_width=True)
         
     else:
         st.warning(f"⚠️ {prediction_result['message']}")
@@ -445,7 +539,7 @@ def display_savings_opportunities(analyzer, visualizer, savings_target, period_f
     st.header("💡 Opportunités d'Économies")
     
     # Utiliser le filtre pour l'analyse des économies
-    filtered_analyzer = AnalysisEngine(analyzer._apply_period_filter(analyzer.df, period_filter, date_range))
+    filtered_analyzer = analyzer.for_period(period_filter, date_range)
     opportunities = filtered_analyzer.identify_savings_opportunities()
     
     # Dépenses compressibles
@@ -526,7 +620,7 @@ def display_financial_health(analyzer, visualizer, period_filter, date_range):
     
     # Utiliser le filtre pour l'analyse de santé financière
     if period_filter != 'all':
-        filtered_analyzer = AnalysisEngine(analyzer._apply_period_filter(analyzer.df, period_filter, date_range))
+        filtered_analyzer = analyzer.for_period(period_filter, date_range)
         health_score = filtered_analyzer.get_financial_health_score()
         st.info("🔍 Score calculé sur la période sélectionnée")
     else:
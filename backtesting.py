@@ -0,0 +1,177 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from forecasting import DEFAULT_SEASON_LENGTH, FORECAST_METHODS, available_methods, forecast
+
+# Horizon évalué (semaines) et historique minimal avant la première origine
+DEFAULT_HORIZON = 4
+DEFAULT_MIN_TRAIN = 20
+
+DEFAULT_REPORT_FILE = 'rapport_backtest.csv'
+
+
+def rolling_origins(nb_points, horizon=DEFAULT_HORIZON, min_train=DEFAULT_MIN_TRAIN, step=1):
+    """Origines de prévision : chaque origine ``t`` ajuste sur ``y[:t]`` et prévoit ``y[t:t + horizon]``"""
+    return list(range(min_train, nb_points - horizon + 1, step))
+
+
+def _evaluate_origin(task):
+    """Scores de chaque méthode pour une série et une origine (fonction de niveau module pour le pool)"""
+    key, y, origin, horizon, methods, season_length, level = task
+    train, actual = y[:origin], y[origin:origin + horizon]
+    applicable = available_methods(len(train), season_length)
+
+    rows = []
+    for method in methods:
+        if method not in applicable:
+            continue
+        try:
+            result = forecast(train, horizon, method, season_length=season_length, level=level)
+        except ValueError:
+            continue
+        # Une méthode en échec s'est rabattue sur une autre : rien à scorer
+        if result['method'] != method:
+            continue
+
+        predictions = np.asarray(result['predictions'])
+        errors = np.abs(predictions - actual)
+        nonzero = actual != 0
+        rows.append({
+            'serie': key,
+            'origine': origin,
+            'methode': method,
+            'mae': errors.mean(),
+            'mape': (errors[nonzero] / actual[nonzero]).mean() * 100 if nonzero.any() else np.nan,
+            'couverture': ((actual >= result['lower']) & (actual <= result['upper'])).mean(),
+            'latence_ms': result['latency_ms']
+        })
+    return rows
+
+
+def backtest(series, horizon=DEFAULT_HORIZON, methods=FORECAST_METHODS, min_train=DEFAULT_MIN_TRAIN,
+             step=1, season_length=DEFAULT_SEASON_LENGTH, level=0.95, n_workers=None):
+    """Rejoue des séries hebdomadaires avec des origines glissantes et score chaque méthode
+
+    ``series`` est une série unique (Series ou tableau), un DataFrame (une
+    série par ligne, par exemple une par compte) ou un dict {clé: série}.
+    Les couples (série, origine) sont évalués en parallèle sur ``n_workers``
+    processus (par défaut le nombre de processeurs, 1 pour un calcul
+    séquentiel). Retourne un DataFrame d'une ligne par (série, origine,
+    méthode) : erreur absolue moyenne, erreur relative moyenne (%),
+    couverture de l'intervalle de prédiction et latence d'ajustement.
+    """
+    if isinstance(series, pd.DataFrame):
+        series = {key: row.to_numpy(dtype=float) for key, row in series.iterrows()}
+    elif not isinstance(series, dict):
+        series = {'total': series}
+
+    tasks = [
+        (key, y, origin, horizon, tuple(methods), season_length, level)
+        for key, y in ((key, np.asarray(values, dtype=float)) for key, values in series.items())
+        for origin in rolling_origins(len(y), horizon, min_train, step)
+    ]
+
+    if n_workers == 1 or len(tasks) <= 1:
+        results = [_evaluate_origin(task) for task in tasks]
+    else:
+        workers = n_workers or os.cpu_count() or 1
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_evaluate_origin, tasks, chunksize=chunksize))
+
+    return pd.DataFrame(
+        [row for rows in results for row in rows],
+        columns=['serie', 'origine', 'methode', 'mae', 'mape', 'couverture', 'latence_ms']
+    )
+
+
+def summarize(scores, latency_budget_ms=None):
+    """Rapport par (série, méthode) et méthode recommandée pour chaque série
+
+    Les méthodes candidates sont celles dont la latence médiane tient dans
+    ``latency_budget_ms``. Elles ne sont comparées que sur les origines où
+    toutes ont produit un score (``mae_commune``, ``nb_origines_communes``) :
+    une méthode applicable seulement aux historiques longs, comme
+    Holt-Winters, n'est pas jugée sur d'autres semaines que ses concurrentes.
+    La méthode recommandée est celle de plus faible ``mae_commune``.
+    """
+    report = scores.groupby(['serie', 'methode'], sort=False).agg(
+        mae=('mae', 'mean'),
+        mape=('mape', 'mean'),
+        couverture=('couverture', 'mean'),
+        latence_ms=('latence_ms', 'median'),
+        nb_origines=('origine', 'size')
+    ).reset_index()
+
+    candidates = report if latency_budget_ms is None else report[report['latence_ms'] <= latency_budget_ms]
+    candidate_scores = scores.merge(candidates[['serie', 'methode']], on=['serie', 'methode'])
+    nb_candidates = candidate_scores['serie'].map(candidates.groupby('serie', sort=False).size())
+    scored_by_all = (candidate_scores.groupby(['serie', 'origine'], sort=False)['methode'].transform('nunique')
+                     == nb_candidates)
+    common = candidate_scores[scored_by_all].groupby(['serie', 'methode'], sort=False).agg(
+        mae_commune=('mae', 'mean'),
+        nb_origines_communes=('origine', 'size')
+    ).reset_index()
+    report = report.merge(common, on=['serie', 'methode'], how='left')
+    report['nb_origines_communes'] = report['nb_origines_communes'].fillna(0).astype(int)
+
+    ranked = report.dropna(subset=['mae_commune'])
+    best = ranked.loc[ranked.groupby('serie', sort=False)['mae_commune'].idxmin()]
+    report['recommandee'] = report.index.isin(best.index)
+    return report.round({'mae': 2, 'mape': 2, 'mae_commune': 2, 'couverture': 3, 'latence_ms': 2})
+
+
+def weekly_series(df):
+    """Dépenses hebdomadaires d'un relevé, par compte si la colonne ``account_id`` existe"""
+    from analysis_engine import AnalysisEngine
+
+    if 'account_id' not in df.columns:
+        return {'total': AnalysisEngine(df).cube.period_expenses('W').to_numpy()}
+    return {
+        account_id: AnalysisEngine(account_df.drop(columns='account_id')).cube.period_expenses('W').to_numpy()
+        for account_id, account_df in df.groupby('account_id', sort=True)
+    }
+
+
+def _load_transactions(filename):
+    """Relevé CSV ou colonnaire (Parquet/Feather), catégorisé si nécessaire"""
+    if filename.lower().endswith('.csv'):
+        df = pd.read_csv(filename)
+    else:
+        from storage import load_columnar
+        df = load_columnar(filename)
+    if 'categorie' not in df.columns:
+        from data_generator import DataGenerator
+        df = DataGenerator().process_data(df)
+    df['date'] = pd.to_datetime(df['date'])
+    return df
+
+
+if __name__ == "__main__":
+    # Rapport nocturne : python backtesting.py [relevé] --output rapport_backtest.csv
+    parser = argparse.ArgumentParser(description="Backtest des méthodes de prévision sur les dépenses hebdomadaires")
+    parser.add_argument('fichier', nargs='?', default='releve_bancaire_fictif.csv')
+    parser.add_argument('--horizon', type=int, default=DEFAULT_HORIZON)
+    parser.add_argument('--min-train', type=int, default=DEFAULT_MIN_TRAIN)
+    parser.add_argument('--step', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--budget-ms', type=float, default=None)
+    parser.add_argument('--output', default=DEFAULT_REPORT_FILE)
+    args = parser.parse_args()
+
+    series = weekly_series(_load_transactions(args.fichier))
+    scores = backtest(series, horizon=args.horizon, min_train=args.min_train, step=args.step,
+                      n_workers=args.workers)
+    report = summarize(scores, args.budget_ms)
+    report.to_csv(args.output, index=False)
+
+    print(f"✅ Rapport '{args.output}' généré : {len(series)} série(s), {scores['origine'].nunique()} origines")
+    print(report.to_string(index=False))
+    print("\n🏆 Méthode recommandée par série:")
+    for _, row in report[report['recommandee']].iterrows():
+        print(f"  {row['serie']}: {row['methode']} (MAE {row['mae_commune']:.2f}€ sur "
+              f"{row['nb_origines_communes']} origines communes, {row['latence_ms']:.1f} ms)")
@@ -0,0 +1,158 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from lru_cache import LRUCache
+
+# Mots-clés identifiant un revenu (prioritaires sur toutes les catégories de dépenses)
+INCOME_KEYWORDS = ['SALAIRE', 'VIREMENT', 'REMBOURSEMENT']
+
+
+def normalize_description(description):
+    """Forme normalisée d'une description, utilisée comme clé de cache"""
+    return str(description).strip().upper()
+
+
+class CategoryCache(LRUCache):
+    """Cache LRU borné ``description normalisée -> catégorie`` avec compteurs de hits/misses"""
+
+    def __init__(self, max_size=100_000):
+        super().__init__(max_size)
+
+    def __getstate__(self):
+        # Seule la configuration est sérialisée : ni le verrou, ni les entrées
+        # (jusqu'à ``max_size``) ne sont envoyés aux processus de ``generate_accounts``
+        return {'max_size': self.capacity}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def get_many(self, keys):
+        """Retourne les catégories connues pour ``keys`` (dict partiel)"""
+        found = {}
+        with self._lock:
+            for key in keys:
+                categorie = self._get_entry(key)
+                if categorie is None:
+                    self.misses += 1
+                else:
+                    found[key] = categorie
+                    self.hits += 1
+        return found
+
+    def put_many(self, items):
+        """Ajoute des associations clé/catégorie en évinçant les moins récemment utilisées"""
+        with self._lock:
+            for key, categorie in items:
+                self._set_entry(key, categorie)
+
+
+# Cache partagé au niveau du processus : il survit aux appels de process_data
+# comme aux reruns Streamlit (le module n'est importé qu'une fois)
+SHARED_CATEGORY_CACHE = CategoryCache()
+
+
+class KeywordCategorizer:
+    """Catégorisation par mots-clés compilée une seule fois en expressions régulières"""
+
+    def __init__(self, categories_depenses, income_keywords=None, cache=None):
+        if income_keywords is None:
+            income_keywords = INCOME_KEYWORDS
+        self.cache = SHARED_CATEGORY_CACHE if cache is None else cache
+
+        # Signature de la table de mots-clés : deux tables différentes ne
+        # partagent jamais leurs entrées dans le cache
+        self.signature = hash((
+            tuple(income_keywords),
+            tuple((categorie, tuple(keywords)) for categorie, keywords in categories_depenses.items())
+        ))
+
+        self.income_pattern = self._compile(income_keywords)
+
+        # Une alternance par catégorie, dans l'ordre du dictionnaire : la première
+        # catégorie qui correspond l'emporte, comme dans la boucle d'origine
+        self.category_patterns = [
+            (categorie, self._compile(keywords))
+            for categorie, keywords in categories_depenses.items()
+            if keywords
+        ]
+
+    def __getstate__(self):
+        # Le cache partagé n'est pas sérialisé : le processus qui désérialise
+        # reprend son propre ``SHARED_CATEGORY_CACHE``
+        state = self.__dict__.copy()
+        if self.cache is SHARED_CATEGORY_CACHE:
+            state['cache'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.cache is None:
+            self.cache = SHARED_CATEGORY_CACHE
+
+    @staticmethod
+    def _compile(keywords):
+        """Compile une liste de mots-clés en une alternance littérale (insensible à l'ordre)"""
+        alternatives = sorted({re.escape(keyword.upper()) for keyword in keywords}, key=len, reverse=True)
+        return re.compile('|'.join(alternatives))
+
+    def categorize(self, description):
+        """Catégorise une description isolée, via le cache"""
+        key = (self.signature, normalize_description(description))
+        categorie = self.cache.get_many([key]).get(key)
+        if categorie is None:
+            categorie = self._match(key[1])
+            self.cache.put_many([(key, categorie)])
+        return categorie
+
+    def _match(self, description):
+        """Évalue les motifs sur une description (sans cache)"""
+        description = description.upper()
+
+        if self.income_pattern.search(description):
+            return 'Revenus'
+
+        for categorie, pattern in self.category_patterns:
+            if pattern.search(description):
+                return categorie
+
+        return 'Autre'
+
+    def categorize_series(self, descriptions):
+        """Catégorise une Series entière
+
+        Les descriptions sont d'abord dédupliquées (``pd.factorize``) puis
+        cherchées dans le cache ; seuls les motifs des descriptions jamais vues
+        sont évalués, et le résultat est redistribué sur toutes les lignes.
+        """
+        codes, uniques = pd.factorize(descriptions)
+        keys = [(self.signature, key) for key in pd.Series(uniques, dtype=object).map(normalize_description)]
+
+        known = self.cache.get_many(keys)
+        missing = [i for i, key in enumerate(keys) if key not in known]
+        if missing:
+            computed = self.categorize_unique(pd.Series([keys[i][1] for i in missing], dtype=object))
+            self.cache.put_many(zip((keys[i] for i in missing), computed))
+            known.update(zip((keys[i] for i in missing), computed))
+
+        labels = np.array([known[key] for key in keys] + ['Autre'], dtype=object)
+
+        # Les valeurs manquantes (code -1) tombent dans 'Autre'
+        return pd.Series(labels[codes], index=descriptions.index, name=descriptions.name)
+
+    def categorize_unique(self, descriptions):
+        """Catégorise un ensemble de descriptions distinctes, motif par motif (vectorisé)"""
+        upper = descriptions.astype(str).str.upper()
+        labels = np.full(len(upper), 'Autre', dtype=object)
+        pending = np.ones(len(upper), dtype=bool)
+
+        for categorie, pattern in [('Revenus', self.income_pattern)] + self.category_patterns:
+            if not pending.any():
+                break
+            matches = upper[pending].str.contains(pattern, regex=True).to_numpy(dtype=bool)
+            idx = np.flatnonzero(pending)[matches]
+            labels[idx] = categorie
+            pending[idx] = False
+
+        return labels
@@ -116,14 +116,8 @@ class AdvancedDashboard:
         """Analyse des patterns de dépenses avec ML"""
         st.subheader("🧠 Analyse des Patterns de Dépenses (IA)")
         
-        # Préparation des données pour le clustering
-        df_daily = self.analyzer.depenses_df.groupby([
-            self.analyzer.depenses_df['date'].dt.date,
-            'categorie'
-        ])['montant'].sum().abs().reset_index()
-        
-        # Pivot pour avoir les catégories en colonnes
-        df_pivot = df_daily.pivot(index='date', columns='categorie', values='montant').fillna(0)
+        # Matrice jours × catégories issue du cube (une ligne par jour de dépense)
+        df_pivot = self.analyzer.cube.daily_category_matrix()
         
         if len(df_pivot) > 10:  # Assez de données pour le clustering
             # Normalisation
@@ -184,17 +178,12 @@ class AdvancedDashboard:
         st.subheader("🚨 Détection d'Anomalies")
         
         # Calcul des dépenses quotidiennes
-        daily_spending = self.analyzer.depenses_df.groupby(
-            self.analyzer.depenses_df['date'].dt.date
-        )['montant'].sum().abs()
+        daily_spending = self.analyzer.cube.daily_expenses()
         
         if len(daily_spending) > 7:
-            # Calcul des seuils d'anomalie (méthode IQR)
-            Q1 = daily_spending.quantile(0.25)
-            Q3 = daily_spending.quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
+            # Seuils d'anomalie (méthode IQR) lus dans l'esquisse de quantiles,
+            # tenue à jour au fil des ajouts sans relire la série
+            lower_bound, upper_bound = self.analyzer.daily_spending_sketch.iqr_bounds(1.5)
             
             # Identification des anomalies
             anomalies = daily_spending[(daily_spending < lower_bound) | (daily_spending > upper_bound)]
@@ -251,6 +240,11 @@ class AdvancedDashboard:
                     for date, amount in anomalies.tail(3).items():
                         st.write(f"• {date}: {amount:.0f}€")
                 
+                with st.expander("📐 Seuils par catégorie"):
+                    category_bounds = self.analyzer.category_sketches.iqr_frame()[['q1', 'q3', 'seuil_haut']]
+                    category_bounds.columns = ['Q1 (€)', 'Q3 (€)', 'Seuil haut (€)']
+                    st.dataframe(category_bounds.round(0), use_container_width=True)
+                
                 # Recommandation
                 if len(anomalies) / len(daily_spending) > 0.2:
                     st.warning("⚠️ Taux d'anomalie élevé - Vérifiez vos habitudes de dépenses")
@@ -405,10 +399,10 @@ class AdvancedDashboard:
     def _calculate_advanced_kpis(self, period_filter, date_range):
         """Calcul des KPIs avancés"""
         # Données filtrées
-        df_filtered = self.analyzer._apply_period_filter(self.analyzer.df, period_filter, date_range)
+        period_analyzer = self.analyzer.for_period(period_filter, date_range)
         
         # KPIs de base
-        weekly_spending = df_filtered[df_filtered['montant'] < 0].resample('W', on='date')['montant'].sum().abs()
+        weekly_spending = period_analyzer.cube.period_expenses('W')
         monthly_data = self.analyzer.get_monthly_summary()
         
         kpis = {
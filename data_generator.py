@@ -1,8 +1,21 @@
 import pandas as pd
 import numpy as np
 import random
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 
+from categorizer import KeywordCategorizer
+from schema import add_time_columns, to_compact
+from storage import DEFAULT_COLUMNAR_FILE, save_columnar
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 class DataGenerator:
     """Générateur de données bancaires fictives pour l'assistant d'épargne"""
     
@@ -53,15 +66,27 @@ class DataGenerator:
             'Loisirs': (10, 80),
             'Santé': (15, 150)
         }
+
+        # Table de mots-clés compilée une fois pour la catégorisation
+        self.categorizer = KeywordCategorizer(self.categories_depenses)
     
-    def generate_transactions(self, nb_transactions=500, start_date=None, end_date=None):
-        """Génère un dataset de transactions fictives"""
-        
+    def generate_transactions(self, nb_transactions=500, start_date=None, end_date=None,
+                              vectorized=False, seed=None):
+        """Génère un dataset de transactions fictives
+
+        Avec ``vectorized=True``, toutes les colonnes sont tirées en une seule
+        passe NumPy (voir ``_generate_transactions_vectorized``), ce qui permet
+        de produire des millions de lignes en quelques secondes.
+        """
+
         if start_date is None:
             start_date = datetime(2023, 1, 1)
         if end_date is None:
             end_date = datetime.now()
-        
+
+        if vectorized:
+            return self._generate_transactions_vectorized(nb_transactions, start_date, end_date, seed)
+
         data = []
         
         # Ajout de revenus mensuels réguliers
@@ -115,44 +140,181 @@ class DataGenerator:
         # Création du DataFrame
         df = pd.DataFrame(data, columns=['date', 'description', 'montant'])
         df = df.sort_values('date').reset_index(drop=True)
-        
+
         return df
-    
+
+    def _generate_transactions_vectorized(self, nb_transactions, start_date, end_date, seed=None):
+        """Version vectorisée de generate_transactions (mêmes colonnes, mêmes lois)"""
+        rng = np.random.default_rng(seed)
+
+        salary_dates, salary_amounts = self._draw_salaries(rng, start_date, end_date)
+
+        # Nombre de transactions par jour : les décalages sortent déjà triés,
+        # ce qui évite un tri complet des dates
+        days_range = (end_date - start_date).days
+        per_day = rng.multinomial(nb_transactions, np.full(days_range + 1, 1 / (days_range + 1)))
+        day_offsets = np.repeat(np.arange(days_range + 1), per_day)
+        expense_dates, codes, montants, vocabulary = self._draw_expenses(
+            rng, nb_transactions, start_date, days_range, day_offsets
+        )
+
+        # Insertion des salaires à leur place chronologique
+        positions = np.searchsorted(expense_dates, salary_dates, side='left')
+        salary_code = len(vocabulary)
+        vocabulary = np.append(vocabulary, 'VIREMENT SALAIRE ENTREPRISE')
+
+        df = pd.DataFrame({
+            'date': np.insert(expense_dates, positions, salary_dates),
+            'description': vocabulary.take(np.insert(codes, positions, salary_code)),
+            'montant': np.insert(montants, positions, salary_amounts)
+        })
+
+        return df
+
+    def iter_transaction_chunks(self, nb_transactions=500, chunk_size=100_000,
+                                start_date=None, end_date=None, seed=None):
+        """Génère les transactions par blocs de ``chunk_size`` lignes, dans l'ordre chronologique
+
+        Seul le nombre de transactions par jour est tiré à l'avance ; chaque bloc
+        est ensuite produit indépendamment, la mémoire reste donc bornée par
+        ``chunk_size`` quelle que soit la taille totale de l'historique.
+        """
+        if start_date is None:
+            start_date = datetime(2023, 1, 1)
+        if end_date is None:
+            end_date = datetime.now()
+
+        rng = np.random.default_rng(seed)
+        salary_dates, salary_amounts = self._draw_salaries(rng, start_date, end_date)
+
+        days_range = (end_date - start_date).days
+        per_day = rng.multinomial(nb_transactions, np.full(days_range + 1, 1 / (days_range + 1)))
+        rows_before_day = np.concatenate([[0], np.cumsum(per_day)])
+
+        # Rang de chaque salaire parmi les dépenses (nombre de dépenses strictement antérieures)
+        start = np.datetime64(pd.Timestamp(start_date))
+        salary_day_offsets = np.ceil((salary_dates - start) / np.timedelta64(1, 'D')).astype(np.int64)
+        salary_ranks = rows_before_day[np.clip(salary_day_offsets, 0, days_range + 1)]
+
+        for lo in range(0, max(nb_transactions, 1), chunk_size):
+            hi = min(lo + chunk_size, nb_transactions)
+            day_offsets = np.searchsorted(rows_before_day, np.arange(lo, hi), side='right') - 1
+            expense_dates, codes, montants, vocabulary = self._draw_expenses(
+                rng, hi - lo, start_date, days_range, day_offsets
+            )
+
+            is_last = hi >= nb_transactions
+            in_chunk = (salary_ranks >= lo) & ((salary_ranks < hi) | is_last)
+            positions = salary_ranks[in_chunk] - lo
+            salary_code = len(vocabulary)
+            vocabulary = np.append(vocabulary, 'VIREMENT SALAIRE ENTREPRISE')
+
+            yield pd.DataFrame({
+                'date': np.insert(expense_dates, positions, salary_dates[in_chunk]),
+                'description': vocabulary.take(np.insert(codes, positions, salary_code)),
+                'montant': np.insert(montants, positions, salary_amounts[in_chunk])
+            })
+
+    def generate_accounts(self, nb_accounts, nb_transactions=500, start_date=None, end_date=None,
+                          base_seed=0, n_workers=None):
+        """Génère plusieurs comptes en parallèle, avec une colonne ``account_id``
+
+        Chaque compte reçoit une graine dérivée de ``(base_seed, account_id)`` :
+        le résultat est identique quel que soit le nombre de processus.
+        """
+        if start_date is None:
+            start_date = datetime(2023, 1, 1)
+        if end_date is None:
+            end_date = datetime.now()
+
+        tasks = [
+            (self, account_id, nb_transactions, start_date, end_date, base_seed)
+            for account_id in range(nb_accounts)
+        ]
+
+        if n_workers == 1 or nb_accounts <= 1:
+            frames = [_generate_account(task) for task in tasks]
+        else:
+            workers = n_workers or os.cpu_count() or 1
+            chunksize = max(1, nb_accounts // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                frames = list(executor.map(_generate_account, tasks, chunksize=chunksize))
+
+        if not frames:
+            return pd.DataFrame(columns=['account_id', 'date', 'description', 'montant'])
+        return pd.concat(frames, ignore_index=True)
+
+    def _draw_salaries(self, rng, start_date, end_date):
+        """Tire les salaires mensuels (fin de mois) à partir d'un pd.date_range"""
+        months = pd.date_range(start_date.replace(day=1), end_date, freq='MS')
+        salary_days = np.minimum(rng.integers(28, 32, len(months)), months.days_in_month)
+        salary_dates = (months + pd.to_timedelta(salary_days - 1, unit='D')).values
+        salary_amounts = rng.uniform(2800, 3500, len(months))
+
+        in_range = salary_dates <= np.datetime64(pd.Timestamp(end_date))
+        return salary_dates[in_range], salary_amounts[in_range]
+
+    def _draw_expenses(self, rng, nb_transactions, start_date, days_range, day_offsets=None):
+        """Tire catégories, commerçants, montants, dates et villes sous forme de tableaux NumPy
+
+        Retourne ``(dates, codes, montants, vocabulaire)`` : les descriptions
+        sont ``vocabulaire[codes]``. ``day_offsets`` permet d'imposer les
+        décalages en jours au lieu de les tirer uniformément sur ``days_range``.
+        """
+        categories = list(self.categories_depenses.keys())
+        lengths = np.array([len(self.categories_depenses[cat]) for cat in categories])
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        lows = np.array([self.montants_ranges[cat][0] for cat in categories], dtype=float)
+        highs = np.array([self.montants_ranges[cat][1] for cat in categories], dtype=float)
+
+        # Vocabulaire commerçant × suffixe de ville ('' ou ' PARIS'/' LYON'/' MARSEILLE')
+        suffixes = ['', ' PARIS', ' LYON', ' MARSEILLE']
+        vocabulary = np.array([
+            merchant + suffix
+            for cat in categories
+            for merchant in self.categories_depenses[cat]
+            for suffix in suffixes
+        ], dtype=object)
+
+        cat_idx = rng.integers(0, len(categories), nb_transactions)
+        merchant_idx = offsets[cat_idx] + (rng.random(nb_transactions) * lengths[cat_idx]).astype(np.int64)
+        montants = -np.round(rng.uniform(lows[cat_idx], highs[cat_idx]), 2)
+
+        if day_offsets is None:
+            day_offsets = rng.integers(0, days_range + 1, nb_transactions)
+        dates = np.datetime64(pd.Timestamp(start_date), 'ns') + day_offsets.astype('timedelta64[D]')
+
+        # 30% de chance d'avoir des détails de ville
+        with_city = rng.random(nb_transactions) < 0.3
+        suffix_idx = np.where(with_city, rng.integers(1, len(suffixes), nb_transactions), 0)
+        codes = merchant_idx * len(suffixes) + suffix_idx
+
+        return dates, codes, montants, vocabulary
+
     def categorize_expense(self, description):
         """Assigne une catégorie basée sur des mots-clés dans la description"""
-        description = description.upper()
-        
-        # Gestion des revenus
-        if any(keyword in description for keyword in ['SALAIRE', 'VIREMENT', 'REMBOURSEMENT']):
-            return 'Revenus'
-        
-        # Catégorisation des dépenses
-        for categorie, keywords in self.categories_depenses.items():
-            for keyword in keywords:
-                if keyword.upper() in description:
-                    return categorie
-        
-        return 'Autre'
+        return self.categorizer.categorize(description)
     
-    def process_data(self, df):
-        """Traite et enrichit le DataFrame avec les catégories et métadonnées"""
+    def process_data(self, df, compact=False):
+        """Traite et enrichit le DataFrame avec les catégories et métadonnées
+
+        Avec ``compact=True``, le résultat utilise le schéma compact de
+        ``schema.py`` (catégories, entiers courts, jours int32, centimes int64).
+        """
         # Conversion des dates
         df['date'] = pd.to_datetime(df['date'])
         
         # Catégorisation
-        df['categorie'] = df['description'].apply(self.categorize_expense)
+        df['categorie'] = self.categorizer.categorize_series(df['description'])
         
         # Colonnes temporelles
-        df['annee'] = df['date'].dt.year
-        df['mois'] = df['date'].dt.month
-        df['mois_nom'] = df['date'].dt.month_name()
-        df['jour_semaine'] = df['date'].dt.day_name()
-        df['semaine'] = df['date'].dt.isocalendar().week
-        df['trimestre'] = df['date'].dt.quarter
+        add_time_columns(df)
         
         # Séparation revenus/dépenses
-        df['type_transaction'] = df['montant'].apply(lambda x: 'Crédit' if x > 0 else 'Débit')
-        
+        df['type_transaction'] = np.where(df['montant'] > 0, 'Crédit', 'Débit')
+
+        if compact:
+            return to_compact(df)
         return df
     
     def save_to_csv(self, df, filename='releve_bancaire_fictif.csv'):
@@ -160,6 +322,52 @@ class DataGenerator:
         df.to_csv(filename, index=False, encoding='utf-8')
         return filename
 
+    def save_to_columnar(self, df, filename=DEFAULT_COLUMNAR_FILE):
+        """Sauvegarde le DataFrame en Parquet/Feather (voir storage.py)"""
+        return save_columnar(df, filename)
+
+    def save_chunks(self, chunks, filename='releve_bancaire_fictif.csv'):
+        """Écrit un flux de DataFrames au fur et à mesure (CSV, Parquet ou Feather selon l'extension)
+
+        Aucun bloc n'est conservé en mémoire après son écriture, ce qui permet
+        de brancher directement ``iter_transaction_chunks`` sur le disque.
+        """
+        extension = os.path.splitext(filename)[1].lower()
+        if extension in ('.parquet', '.feather', '.arrow') and not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow est requis pour écrire au format Parquet/Feather")
+
+        writer = None
+        schema = None
+        try:
+            for i, chunk in enumerate(chunks):
+                if extension in ('.parquet', '.feather', '.arrow'):
+                    table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+                    if writer is None:
+                        schema = table.schema
+                        if extension == '.parquet':
+                            writer = pq.ParquetWriter(filename, schema)
+                        else:
+                            writer = pa.ipc.new_file(filename, schema)
+                    writer.write_table(table)
+                else:
+                    chunk.to_csv(filename, index=False, encoding='utf-8',
+                                 mode='w' if i == 0 else 'a', header=(i == 0))
+        finally:
+            if writer is not None:
+                writer.close()
+
+        return filename
+
+def _generate_account(task):
+    """Génère un compte isolé (fonction de niveau module pour le pool de processus)"""
+    generator, account_id, nb_transactions, start_date, end_date, base_seed = task
+    seed = np.random.SeedSequence([base_seed, account_id])
+    df = generator.generate_transactions(
+        nb_transactions, start_date, end_date, vectorized=True, seed=seed
+    )
+    df.insert(0, 'account_id', np.int32(account_id))
+    return df
+
 if __name__ == "__main__":
     # Test du générateur
     generator = DataGenerator()
@@ -0,0 +1,470 @@
+import math
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+try:
+    from statsmodels.tsa.arima.model import ARIMA
+    STATSMODELS_AVAILABLE = True
+except ImportError:
+    STATSMODELS_AVAILABLE = False
+
+# Méthodes disponibles, de la plus précise (et lente) à la plus rapide
+FORECAST_METHODS = ('arima', 'holt_winters', 'holt', 'moving_average')
+
+# Nombre minimal de semaines pour chaque méthode
+MIN_POINTS = {'arima': 20, 'holt': 4, 'moving_average': 1}
+
+# Saisonnalité annuelle d'une série hebdomadaire
+DEFAULT_SEASON_LENGTH = 52
+
+# Latences attendues (ms) par méthode : ordres de grandeur remplacés par une
+# mesure sur une série témoin au premier choix, puis affinés par les temps mesurés
+_expected_latency_ms = {'arima': 500.0, 'holt_winters': 20.0, 'holt': 2.0, 'moving_average': 0.1}
+_calibrated = set()
+_latency_lock = threading.Lock()
+
+# Grilles de paramètres de lissage (forme à correction d'erreur : beta <= alpha)
+ALPHA_GRID = np.linspace(0.05, 1.0, 20)
+BETA_FRACTIONS = np.linspace(0.0, 1.0, 11)
+GAMMA_GRID = np.linspace(0.0, 0.5, 6)
+
+# Nombre de nouveaux points après lequel un modèle lissé repart d'une
+# recherche complète des paramètres (un trimestre de semaines)
+REFIT_INTERVAL = 13
+
+# Délai maximal d'ajustement d'une série dans un lot (secondes)
+DEFAULT_SERIES_TIMEOUT_S = 5.0
+
+
+def expected_latency_ms(method):
+    """Latence attendue d'une méthode de prévision (moyenne glissante des mesures)"""
+    with _latency_lock:
+        return _expected_latency_ms[method]
+
+
+def _record_latency(method, latency_ms):
+    with _latency_lock:
+        if method in _calibrated:
+            _expected_latency_ms[method] = 0.8 * _expected_latency_ms[method] + 0.2 * latency_ms
+        else:
+            _expected_latency_ms[method] = latency_ms
+            _calibrated.add(method)
+
+
+def _calibrate(method, nb_points, season_length=DEFAULT_SEASON_LENGTH):
+    """Mesure une fois la latence d'une méthode sur une série témoin de ``nb_points`` semaines
+
+    Sans cette mesure, une méthode dont la latence supposée dépasse le
+    budget ne serait jamais choisie, donc jamais mesurée.
+    """
+    with _latency_lock:
+        if method in _calibrated:
+            return
+    rng = np.random.default_rng(0)
+    weeks = np.arange(nb_points)
+    y = 300 + 50 * np.sin(2 * np.pi * weeks / season_length) + rng.normal(0, 40, nb_points)
+    started = time.perf_counter()
+    try:
+        _fit(method, y, 4, season_length, 0.95, None)
+    except Exception:
+        return
+    _record_latency(method, (time.perf_counter() - started) * 1000)
+
+
+def available_methods(nb_points, season_length=DEFAULT_SEASON_LENGTH):
+    """Méthodes applicables à une série de ``nb_points`` valeurs, de la plus précise à la plus rapide"""
+    methods = []
+    if STATSMODELS_AVAILABLE and nb_points >= MIN_POINTS['arima']:
+        methods.append('arima')
+    if nb_points >= 2 * season_length:
+        methods.append('holt_winters')
+    if nb_points >= MIN_POINTS['holt']:
+        methods.append('holt')
+    methods.append('moving_average')
+    return methods
+
+
+def choose_method(nb_points, latency_budget_ms=None, season_length=DEFAULT_SEASON_LENGTH):
+    """Méthode la plus précise dont la latence attendue tient dans le budget
+
+    Sans budget, le choix d'origine est conservé : ARIMA s'il est
+    applicable, sinon la moyenne mobile.
+    """
+    methods = available_methods(nb_points, season_length)
+    if latency_budget_ms is None:
+        return 'arima' if 'arima' in methods else 'moving_average'
+    for method in methods:
+        _calibrate(method, nb_points, season_length)
+        if expected_latency_ms(method) <= latency_budget_ms:
+            return method
+    return methods[-1]
+
+
+def _interval(predictions, variances, level):
+    """Bornes inférieure et supérieure d'un intervalle de prédiction gaussien"""
+    z = NormalDist().inv_cdf(0.5 + level / 2)
+    half_width = z * np.sqrt(variances)
+    return predictions - half_width, predictions + half_width
+
+
+def moving_average_forecast(y, periods=4, level=0.95, state=None):
+    """Moyenne des 8 dernières valeurs prolongée par la tendance début/fin de série"""
+    y = np.asarray(y, dtype=float)
+    recent_avg = y[-8:].mean()
+    trend = (y[-4:].mean() - y[:4].mean()) / len(y)
+    predictions = recent_avg + trend * np.arange(1, periods + 1)
+    sigma2 = y[-8:].var(ddof=1) if len(y) > 1 else 0.0
+    lower, upper = _interval(predictions, np.full(periods, sigma2), level)
+    return {'predictions': predictions, 'lower': lower, 'upper': upper,
+            'params': {'moyenne_recente': recent_avg, 'tendance': trend},
+            'state': {'nb_points': len(y)}, 'previous_state': {'nb_points': len(y) - 1}}
+
+
+def _smooth(y, alpha, beta, gamma=None, season_length=None, state=None):
+    """Récursions de Holt (ou Holt-Winters additif) évaluées pour toute une grille de paramètres
+
+    ``alpha``, ``beta`` (et ``gamma``) sont des tableaux de même forme ; la
+    boucle porte sur le temps, chaque pas étant vectorisé sur la grille.
+    ``state`` (niveau, tendance, saisons, sse, t) reprend un lissage déjà
+    effectué sur ``y[:t]`` au lieu de repartir du début de la série.
+    Retourne la somme des carrés des erreurs à un pas, les états finaux et
+    l'état ``(sse, niveau, tendance, saisons)`` avant le dernier point
+    (``None`` si ce point n'a pas été lissé ici).
+    """
+    seasonal = gamma is not None
+    m = season_length
+    if state is not None:
+        level, trend, seasons, sse, start = state
+        seasons = np.array(seasons, dtype=float) if seasonal else None
+    elif seasonal:
+        level = np.full(alpha.shape, y[:m].mean())
+        trend = np.full(alpha.shape, (y[m:2 * m].mean() - y[:m].mean()) / m)
+        seasons = np.tile(y[:m] - y[:m].mean(), alpha.shape + (1,))
+        sse = np.zeros(alpha.shape)
+        start = 0
+    else:
+        level = np.full(alpha.shape, y[0])
+        trend = np.full(alpha.shape, y[1] - y[0])
+        seasons = None
+        sse = np.zeros(alpha.shape)
+        start = 1
+
+    previous = None
+    for t in range(start, len(y)):
+        if t == len(y) - 1:
+            previous = (sse, level, trend, seasons.copy() if seasonal else None)
+        season = seasons[..., t % m] if seasonal else 0.0
+        error = y[t] - (level + trend + season)
+        sse = sse + error ** 2
+        level = level + trend + alpha * error
+        trend = trend + beta * error
+        if seasonal:
+            seasons[..., t % m] = season + gamma * error
+    return sse, level, trend, seasons, previous
+
+
+def _warm(state, nb_points):
+    """Vrai si l'état d'un ajustement précédent peut être prolongé sans nouvelle recherche de paramètres"""
+    return state is not None and nb_points - state['fitted_on'] < REFIT_INTERVAL
+
+
+def _previous_state(state, previous, best=()):
+    """État du même ajustement arrêté avant le dernier point de la série
+
+    La dernière semaine est souvent incomplète et révisée au prochain
+    chargement : le cache de modèles indexe aussi cet état sous ``y[:-1]``.
+    """
+    if previous is None:
+        return None
+    sse, level, trend, seasons = previous
+    state = dict(state, sse=float(np.asarray(sse)[best]), level=float(np.asarray(level)[best]),
+                 trend=float(np.asarray(trend)[best]), nb_points=state['nb_points'] - 1)
+    if seasons is not None:
+        state['seasons'] = np.asarray(seasons)[best].tolist()
+    return state
+
+
+def holt_forecast(y, periods=4, level=0.95, state=None):
+    """Lissage exponentiel double de Holt (tendance additive), paramètres choisis par grille
+
+    Avec l'``state`` d'un ajustement sur un préfixe de ``y``, les paramètres
+    sont conservés et seuls les nouveaux points sont lissés.
+    """
+    y = np.asarray(y, dtype=float)
+    if _warm(state, len(y)):
+        a, b, fitted_on = state['alpha'], state['beta'], state['fitted_on']
+        best = ()
+        sse, final_level, final_trend, _, previous = _smooth(
+            y, a, b, state=(state['level'], state['trend'], None, state['sse'], state['nb_points'])
+        )
+    else:
+        alpha, beta = np.meshgrid(ALPHA_GRID, BETA_FRACTIONS, indexing='ij')
+        beta = alpha * beta
+        sse, levels, trends, _, previous = _smooth(y, alpha, beta)
+
+        best = np.unravel_index(np.argmin(sse), sse.shape)
+        a, b, fitted_on = alpha[best], beta[best], len(y)
+        sse, final_level, final_trend = sse[best], levels[best], trends[best]
+    horizons = np.arange(1, periods + 1)
+    predictions = final_level + final_trend * horizons
+
+    # Variance à h pas : sigma² (1 + somme des c_j², c_j = alpha + beta j)
+    sigma2 = sse / max(len(y) - 3, 1)
+    c = a + b * np.arange(1, periods)
+    variances = sigma2 * (1 + np.concatenate([[0.0], np.cumsum(c ** 2)]))
+    lower, upper = _interval(predictions, variances, level)
+    state = {'alpha': float(a), 'beta': float(b), 'level': float(final_level),
+             'trend': float(final_trend), 'sse': float(sse),
+             'nb_points': len(y), 'fitted_on': fitted_on}
+    return {'predictions': predictions, 'lower': lower, 'upper': upper,
+            'params': {'alpha': float(a), 'beta': float(b)},
+            'state': state, 'previous_state': _previous_state(state, previous, best)}
+
+
+def holt_winters_forecast(y, periods=4, season_length=DEFAULT_SEASON_LENGTH, level=0.95, state=None):
+    """Holt-Winters additif (tendance et saisonnalité additives), paramètres choisis par grille
+
+    Même démarrage à chaud que ``holt_forecast`` à partir de ``state``.
+    """
+    y = np.asarray(y, dtype=float)
+    m = season_length
+    if _warm(state, len(y)):
+        a, b, g, fitted_on = state['alpha'], state['beta'], state['gamma'], state['fitted_on']
+        best = ()
+        sse, final_level, final_trend, final_seasons, previous = _smooth(
+            y, a, b, g, m,
+            state=(state['level'], state['trend'], state['seasons'], state['sse'], state['nb_points'])
+        )
+    else:
+        alpha, beta, gamma = np.meshgrid(ALPHA_GRID, BETA_FRACTIONS, GAMMA_GRID, indexing='ij')
+        beta = alpha * beta
+        gamma = gamma * (1 - alpha)
+        sse, levels, trends, seasons, previous = _smooth(y, alpha, beta, gamma, m)
+
+        best = np.unravel_index(np.argmin(sse), sse.shape)
+        a, b, g, fitted_on = alpha[best], beta[best], gamma[best], len(y)
+        sse, final_level, final_trend, final_seasons = sse[best], levels[best], trends[best], seasons[best]
+    horizons = np.arange(1, periods + 1)
+    season_index = (len(y) + horizons - 1) % m
+    predictions = final_level + final_trend * horizons + final_seasons[season_index]
+
+    # c_j = alpha + beta j (+ gamma quand j est un multiple de la saison)
+    sigma2 = sse / max(len(y) - 3 - m, 1)
+    j = np.arange(1, periods)
+    c = a + b * j + g * (j % m == 0)
+    variances = sigma2 * (1 + np.concatenate([[0.0], np.cumsum(c ** 2)]))
+    lower, upper = _interval(predictions, variances, level)
+    state = {'alpha': float(a), 'beta': float(b), 'gamma': float(g), 'level': float(final_level),
+             'trend': float(final_trend), 'seasons': final_seasons.tolist(), 'sse': float(sse),
+             'nb_points': len(y), 'fitted_on': fitted_on}
+    return {'predictions': predictions, 'lower': lower, 'upper': upper,
+            'params': {'alpha': float(a), 'beta': float(b), 'gamma': float(g), 'saison': m},
+            'state': state, 'previous_state': _previous_state(state, previous, best)}
+
+
+def arima_forecast(y, periods=4, level=0.95, state=None):
+    """ARIMA(1,1,1) de statsmodels : plus lent, méthode de référence
+
+    Avec l'``state`` d'un ajustement précédent, l'optimisation part des
+    paramètres déjà estimés.
+    """
+    start_params = state['params'] if state is not None else None
+    fitted_model = ARIMA(np.asarray(y, dtype=float), order=(1, 1, 1)).fit(start_params=start_params)
+    result = fitted_model.get_forecast(steps=periods)
+    bounds = np.asarray(result.conf_int(alpha=1 - level))
+    params = np.asarray(fitted_model.params, dtype=float).tolist()
+    # Les paramètres estimés restent un bon point de départ sans le dernier point
+    return {'predictions': np.asarray(result.predicted_mean), 'lower': bounds[:, 0], 'upper': bounds[:, 1],
+            'params': {'order': (1, 1, 1)},
+            'state': {'params': params, 'nb_points': len(y)},
+            'previous_state': {'params': params, 'nb_points': len(y) - 1}}
+
+
+def _fit(method, y, periods, season_length, level, state):
+    if method == 'arima':
+        return arima_forecast(y, periods, level, state)
+    if method == 'holt_winters':
+        return holt_winters_forecast(y, periods, season_length, level, state)
+    if method == 'holt':
+        return holt_forecast(y, periods, level, state)
+    return moving_average_forecast(y, periods, level, state)
+
+
+def forecast(y, periods=4, method='auto', latency_budget_ms=None,
+             season_length=DEFAULT_SEASON_LENGTH, level=0.95, model_cache=None):
+    """Prévision des ``periods`` prochaines valeurs d'une série
+
+    ``method`` vaut 'auto' ou l'une de ``FORECAST_METHODS``. En mode 'auto',
+    la méthode la plus précise dont la latence attendue tient dans
+    ``latency_budget_ms`` est retenue ; sans budget, ARIMA ou à défaut la
+    moyenne mobile, comme à l'origine. Si une méthode échoue, la suivante
+    (plus rapide) prend le relais. Les valeurs prédites sont positives ou
+    nulles.
+
+    Avec un ``model_cache`` (``model_cache.ForecastModelCache``), une série
+    déjà prévue est servie depuis le cache et une série prolongée repart du
+    modèle de son préfixe ; ``fit`` indique 'cache', 'warm' ou 'full'.
+    """
+    y = np.asarray(y, dtype=float)
+    auto = method == 'auto'
+    if auto:
+        method = choose_method(len(y), latency_budget_ms, season_length)
+    elif method not in FORECAST_METHODS:
+        raise ValueError(f"Méthode de prévision inconnue: {method}")
+
+    candidates = [m for m in available_methods(len(y), season_length)
+                  if FORECAST_METHODS.index(m) >= FORECAST_METHODS.index(method)]
+    if auto and latency_budget_ms is None:
+        # Comportement d'origine : un ARIMA en échec se rabat sur la moyenne mobile
+        candidates = list(dict.fromkeys([method, 'moving_average']))
+    for candidate in candidates:
+        season = season_length if candidate == 'holt_winters' else None
+        started = time.perf_counter()
+        fit, state = 'full', None
+        if model_cache is not None:
+            fit, state = model_cache.lookup(candidate, y, periods, level, season)
+            if fit == 'cache':
+                return {
+                    'method': candidate,
+                    'predictions': list(state['predictions']),
+                    'lower': list(state['lower']),
+                    'upper': list(state['upper']),
+                    'params': dict(state['params']),
+                    'fit': fit,
+                    'latency_ms': (time.perf_counter() - started) * 1000
+                }
+        try:
+            result = _fit(candidate, y, periods, season_length, level, state)
+        except Exception:
+            continue
+        latency_ms = (time.perf_counter() - started) * 1000
+        # Seuls les ajustements complets alimentent l'estimation de latence :
+        # le choix de méthode reste valable quand le cache est froid
+        if fit == 'full':
+            _record_latency(candidate, latency_ms)
+
+        output = {
+            'predictions': [max(float(x), 0) for x in result['predictions']],
+            'lower': [max(float(x), 0) for x in result['lower']],
+            'upper': [max(float(x), 0) for x in result['upper']],
+            'params': result['params']
+        }
+        if model_cache is not None:
+            model_cache.store(candidate, y, periods, level, result['state'], output, season,
+                              previous_state=result['previous_state'])
+        return {
+            'method': candidate,
+            'predictions': list(output['predictions']),
+            'lower': list(output['lower']),
+            'upper': list(output['upper']),
+            'params': dict(output['params']),
+            'fit': fit,
+            'latency_ms': latency_ms
+        }
+    raise ValueError("Aucune méthode de prévision applicable")
+
+
+class SeriesTimeout(Exception):
+    """Ajustement d'une série interrompu par son délai maximal"""
+
+
+def _raise_timeout(signum, frame):
+    raise SeriesTimeout()
+
+
+def _forecast_series(y, periods, method, latency_budget_ms, season_length, level, timeout_s):
+    """Prévision d'une série d'un lot, exécutée dans un processus du pool
+
+    Passé ``timeout_s``, la méthode en cours est interrompue (SIGALRM) et
+    ``forecast`` se rabat sur une méthode plus rapide. Sans SIGALRM
+    (Windows), seul le délai global du lot s'applique.
+    """
+    timed = timeout_s is not None and hasattr(signal, 'setitimer')
+    if timed:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout_s)
+    started = time.perf_counter()
+    try:
+        result = forecast(y, periods, method, latency_budget_ms, season_length, level)
+        result['success'] = True
+    except Exception as e:
+        result = {'success': False, 'message': f'Erreur dans la prédiction: {str(e)}', 'predictions': None}
+    finally:
+        if timed:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    result['timed_out'] = timed and time.perf_counter() - started >= timeout_s
+    return result
+
+
+def forecast_batch(series, periods=4, method='auto', latency_budget_ms=None,
+                   season_length=DEFAULT_SEASON_LENGTH, level=0.95,
+                   max_workers=None, timeout_s=DEFAULT_SERIES_TIMEOUT_S):
+    """Prévisions d'un lot de séries, ajustées en parallèle dans un pool de processus
+
+    ``series`` est un DataFrame (une série par ligne, par exemple catégories
+    × semaines, ou comptes × catégories avec un MultiIndex) ou un tableau
+    dont le dernier axe est le temps (catégories × semaines, comptes ×
+    catégories × semaines). Retourne un dict {clé: résultat}, la clé étant
+    le libellé de ligne ou le tuple d'indices du tableau ; chaque résultat
+    est celui de ``forecast`` avec ``success`` (et ``message`` en cas
+    d'échec).
+
+    ``max_workers`` vaut par défaut le nombre de processeurs. Chaque série
+    dispose de ``timeout_s`` secondes pour sa méthode principale avant repli
+    sur une méthode plus rapide ; une série qui ne rend pas la main avant la
+    fin du délai global du lot est signalée en échec sans bloquer les autres.
+    """
+    if isinstance(series, pd.DataFrame):
+        keys = list(series.index)
+        values = series.to_numpy(dtype=float)
+    else:
+        values = np.asarray(series, dtype=float)
+        keys = list(np.ndindex(values.shape[:-1]))
+        values = values.reshape(len(keys), values.shape[-1])
+    if not keys:
+        return {}
+    # Méthode choisie (et latences calibrées) une fois pour tout le lot
+    if method == 'auto':
+        method = choose_method(values.shape[-1], latency_budget_ms, season_length)
+
+    workers = min(max_workers or os.cpu_count() or 1, len(keys))
+    results = {}
+    pending = set()
+    # Processus démarrés par 'spawn' : un fork depuis le serveur multithread
+    # de Streamlit peut hériter d'un verrou tenu par un autre thread et bloquer
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    try:
+        futures = {
+            executor.submit(_forecast_series, y, periods, method, latency_budget_ms,
+                            season_length, level, timeout_s): key
+            for key, y in zip(keys, values)
+        }
+        # Délai global : chaque processus traite au plus ce nombre de séries,
+        # chacune bornée par son délai plus le repli sur une méthode rapide,
+        # avec une marge pour le démarrage des processus
+        deadline = None
+        if timeout_s is not None:
+            deadline = math.ceil(len(keys) / workers) * (timeout_s + 1.0) + 10.0
+        done, pending = wait(futures, timeout=deadline)
+        for future in done:
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                results[futures[future]] = {'success': False, 'message': f'Erreur dans la prédiction: {str(e)}',
+                                            'predictions': None}
+        for future in pending:
+            results[futures[future]] = {'success': False, 'message': 'Délai de prédiction dépassé',
+                                        'predictions': None, 'timed_out': True}
+    finally:
+        # Les processus encore occupés par une série en retard ne sont pas attendus
+        executor.shutdown(wait=not pending, cancel_futures=True)
+    return {key: results[key] for key in keys}
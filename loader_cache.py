@@ -0,0 +1,105 @@
+import hashlib
+import os
+import time
+
+import numpy as np
+
+from lru_cache import LRUCache
+
+# Nombre de fichiers dont l'empreinte de contenu reste mémorisée
+DIGEST_MEMO_SIZE = 64
+
+
+class DigestMemo(LRUCache):
+    """Empreintes de contenu déjà calculées : un fichier inchangé n'est jamais relu pour être haché
+
+    Une seule entrée par chemin, remplacée quand sa taille ou sa date
+    change ; les chemins les moins récemment consultés sont évincés.
+    """
+
+    def __init__(self, max_entries=DIGEST_MEMO_SIZE):
+        super().__init__(max_entries)
+
+    def get(self, stat_key):
+        """Empreinte mémorisée pour ``(chemin, taille, mtime_ns)``, ``None`` si absente ou périmée"""
+        with self._lock:
+            entry = self._get_entry(stat_key[0])
+            if entry is not None and entry[0] == stat_key:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, stat_key, digest):
+        """Mémorise l'empreinte de ``(chemin, taille, mtime_ns)`` à la place de la précédente"""
+        with self._lock:
+            self._set_entry(stat_key[0], (stat_key, digest))
+
+
+_digest_memo = DigestMemo()
+
+
+def file_fingerprint(path):
+    """Empreinte ``(chemin, taille, mtime_ns, sha1)`` d'un fichier"""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    stat_key = (path, stat.st_size, stat.st_mtime_ns)
+
+    digest = _digest_memo.get(stat_key)
+    if digest is None:
+        sha1 = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha1.update(block)
+        digest = sha1.hexdigest()
+        _digest_memo.put(stat_key, digest)
+
+    return stat_key + (digest,)
+
+
+def freeze_frame(df):
+    """Rend les tableaux NumPy d'un DataFrame non modifiables (partage sans copie entre sessions)"""
+    for column in df.columns:
+        values = df[column].values
+        while isinstance(values, np.ndarray):
+            values.flags.writeable = False
+            values = values.base
+    return df
+
+
+class LoaderCache(LRUCache):
+    """Cache de DataFrames chargés, indexé par l'empreinte du fichier source
+
+    Un changement de taille, de date ou de contenu du fichier produit une
+    nouvelle clé, donc un rechargement. Les DataFrames sont rendus non
+    modifiables et partagés tels quels entre toutes les sessions.
+    """
+
+    def __init__(self, ttl=None, max_entries=4):
+        super().__init__(max_entries)
+        self.ttl = ttl
+
+    def get_or_load(self, key, loader):
+        """Retourne le DataFrame associé à ``key``, en appelant ``loader()`` si absent ou expiré"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._get_entry(key)
+            if entry is not None and (self.ttl is None or now - entry[1] <= self.ttl):
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        df = loader()
+        if df is not None:
+            freeze_frame(df)
+            with self._lock:
+                self._set_entry(key, (df, now))
+        return df
+
+    def key_for(self, df):
+        """Clé (empreinte du fichier source) sous laquelle ``df`` est en cache, ``None`` sinon"""
+        with self._lock:
+            for key, (value, _) in self._entries.items():
+                if value is df:
+                    return key
+        return None
@@ -0,0 +1,84 @@
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Base des caches LRU du projet : entrées ordonnées, verrou, compteurs de hits/misses
+
+    Les entrées les moins récemment utilisées sont évincées tant que leur
+    taille cumulée (``_entry_size``, une unité par entrée par défaut)
+    dépasse ``capacity`` (``None`` : pas de limite). Les sous-classes ne
+    lisent et n'écrivent les entrées (``_get_entry`` / ``_set_entry``)
+    que verrou tenu.
+    """
+
+    def __init__(self, capacity=None):
+        self.capacity = capacity
+        self.current_size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Le verrou n'est pas sérialisable : il est recréé à la désérialisation
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _entry_size(self, entry):
+        """Taille d'une entrée, comptée dans ``capacity``"""
+        return 1
+
+    def _get_entry(self, key):
+        """Entrée de ``key`` marquée comme la plus récente, ``None`` si absente (verrou tenu)"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _set_entry(self, key, entry):
+        """Ajoute ou remplace l'entrée de ``key`` puis évince les plus anciennes (verrou tenu)
+
+        Une entrée plus grande que ``capacity`` à elle seule n'est pas
+        conservée ; retourne ``True`` si elle l'a été.
+        """
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.current_size -= self._entry_size(previous)
+        size = self._entry_size(entry)
+        if self.capacity is not None and size > self.capacity:
+            return False
+        self._entries[key] = entry
+        self.current_size += size
+        while self.capacity is not None and self.current_size > self.capacity:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_size -= self._entry_size(evicted)
+        return True
+
+    def _reset(self):
+        """Vide les entrées et remet les compteurs à zéro (verrou tenu)"""
+        self._entries.clear()
+        self.current_size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        """Vide le cache et remet les compteurs à zéro"""
+        with self._lock:
+            self._reset()
+
+    def stats(self):
+        """Statistiques d'utilisation du cache"""
+        total = self.hits + self.misses
+        return {
+            'taille': len(self._entries),
+            'capacite': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'taux_hit': self.hits / total if total else 0.0
+        }
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from lru_cache import LRUCache
+
+# Répertoire de persistance des modèles de prévision ajustés
+DEFAULT_MODEL_DIR = 'modeles_prevision'
+
+# Nombre maximal de points ajoutés en fin de série pour lesquels un modèle
+# précédent sert de point de départ (au-delà, ajustement complet)
+MAX_APPENDED_POINTS = 8
+
+# Nombre maximal de modèles persistés : au-delà, les fichiers les moins
+# récemment écrits ou relus sont supprimés
+MAX_FILES = 1024
+
+
+def series_digest(y):
+    """Empreinte d'une série de valeurs (arrondies au millionième)
+
+    L'arrondi rend l'empreinte insensible à l'ordre de sommation : une série
+    hebdomadaire mise à jour par ajouts garde la même empreinte qu'une série
+    recalculée entièrement.
+    """
+    values = np.round(np.asarray(y, dtype=float), 6) + 0.0
+    return hashlib.sha1(np.ascontiguousarray(values).tobytes()).hexdigest()
+
+
+def _result_key(periods, level):
+    return f'{periods}:{level}'
+
+
+class ForecastModelCache(LRUCache):
+    """Modèles de prévision ajustés, indexés par l'empreinte de la série et persistés sur disque
+
+    Chaque entrée conserve l'état du modèle (paramètres, niveau, tendance...)
+    et les prévisions déjà calculées. Une série identique est servie sans
+    calcul ; une série prolongée de quelques points repart de l'état du
+    modèle de son préfixe (démarrage à chaud). L'état arrêté avant le
+    dernier point est aussi indexé : une dernière semaine incomplète,
+    révisée au chargement suivant, n'empêche pas le démarrage à chaud.
+    ``max_entries`` borne les entrées en mémoire, ``max_files`` les
+    fichiers persistés.
+    """
+
+    def __init__(self, directory=DEFAULT_MODEL_DIR, max_entries=256, max_files=MAX_FILES):
+        super().__init__(max_entries)
+        self.directory = directory
+        self.max_files = max_files
+        self.warm_starts = 0
+        # Nombre de fichiers persistés, compté au premier enregistrement
+        self._file_count = None
+
+    def _path(self, key):
+        name = hashlib.sha1(json.dumps(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f'{name}.json')
+
+    def _get(self, key):
+        """Entrée en mémoire, sinon relue sur disque (``None`` si absente ou illisible)"""
+        with self._lock:
+            entry = self._get_entry(key)
+            if entry is not None:
+                return entry
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            # Un modèle relu redevient le plus récent pour l'élagage du répertoire
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        self._remember(key, entry)
+        return entry
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._set_entry(key, entry)
+
+    def lookup(self, method, y, periods, level, season_length=None):
+        """Prévision en cache pour cette série, ou état du modèle d'un préfixe
+
+        Retourne ``('cache', resultat)``, ``('warm', etat)`` ou
+        ``('full', None)``.
+        """
+        y = np.asarray(y, dtype=float)
+        entry = self._get((method, season_length, series_digest(y)))
+        if entry is not None:
+            result = entry['results'].get(_result_key(periods, level))
+            if result is not None:
+                with self._lock:
+                    self.hits += 1
+                return 'cache', result
+            # Même série, autre horizon : l'état du modèle suffit
+            with self._lock:
+                self.warm_starts += 1
+            return 'warm', entry['state']
+
+        for appended in range(1, min(MAX_APPENDED_POINTS, len(y) - 1) + 1):
+            entry = self._get((method, season_length, series_digest(y[:-appended])))
+            if entry is not None:
+                with self._lock:
+                    self.warm_starts += 1
+                return 'warm', entry['state']
+
+        with self._lock:
+            self.misses += 1
+        return 'full', None
+
+    def store(self, method, y, periods, level, state, result, season_length=None, previous_state=None):
+        """Enregistre l'état du modèle ajusté sur ``y`` et la prévision obtenue
+
+        ``previous_state`` est l'état du même ajustement avant le dernier
+        point : il est indexé sous ``y[:-1]`` s'il n'y a pas déjà un modèle.
+        """
+        y = np.asarray(y, dtype=float)
+        key = (method, season_length, series_digest(y))
+        entry = self._get(key) or {'method': method, 'nb_points': len(y), 'results': {}}
+        entry = dict(entry, state=state, results=dict(entry['results']))
+        entry['results'][_result_key(periods, level)] = result
+        self._write(key, entry)
+
+        if previous_state is not None and len(y) > 1:
+            previous_key = (method, season_length, series_digest(y[:-1]))
+            if self._get(previous_key) is None:
+                self._write(previous_key, {'method': method, 'nb_points': len(y) - 1,
+                                           'state': previous_state, 'results': {}})
+
+    def _write(self, key, entry):
+        """Garde l'entrée en mémoire et la persiste (écriture atomique)"""
+        self._remember(key, entry)
+        if self.directory is None:
+            return
+        # Un disque en lecture seule laisse le cache en mémoire
+        path = self._path(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            is_new = not os.path.exists(path)
+            temporary = f'{path}.tmp'
+            with open(temporary, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(temporary, path)
+        except OSError:
+            return
+        with self._lock:
+            if self._file_count is None:
+                self._file_count = self._count_files()
+            elif is_new:
+                self._file_count += 1
+            over = self.max_files is not None and self._file_count > self.max_files
+        if over:
+            self._prune_files()
+
+    def _model_files(self):
+        return [entry for entry in os.scandir(self.directory) if entry.name.endswith('.json')]
+
+    def _count_files(self):
+        try:
+            return len(self._model_files())
+        except OSError:
+            return 0
+
+    def _prune_files(self):
+        """Supprime les modèles persistés les plus anciens au-delà de ``max_files``
+
+        Un dixième de marge est libéré pour ne pas réélaguer à chaque ajout.
+        """
+        keep = self.max_files - self.max_files // 10
+        try:
+            files = sorted(self._model_files(), key=lambda entry: entry.stat().st_mtime_ns)
+            for entry in files[:max(len(files) - keep, 0)]:
+                os.remove(entry.path)
+        except OSError:
+            pass
+        with self._lock:
+            self._file_count = self._count_files()
+
+    def clear(self):
+        """Vide le cache en mémoire et supprime les modèles persistés"""
+        with self._lock:
+            self._reset()
+            self.warm_starts = 0
+            self._file_count = None
+        if self.directory is not None and os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith('.json'):
+                    os.remove(os.path.join(self.directory, name))
+
+    def stats(self):
+        """Statistiques d'utilisation du cache"""
+        total = self.hits + self.warm_starts + self.misses
+        return dict(super().stats(), demarrages_a_chaud=self.warm_starts,
+                    taux_hit=self.hits / total if total else 0.0)
+
+
+# Cache partagé au niveau du processus, persisté entre les redémarrages
+SHARED_MODEL_CACHE = ForecastModelCache()
@@ -0,0 +1,182 @@
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+
+class RunningStats:
+    """Nombre, moyenne et variance en ligne (algorithme de Welford)
+
+    Chaque valeur est cumulée en O(1) ; deux accumulateurs calculés sur des
+    partitions différentes se fusionnent exactement (Chan et al.).
+    """
+
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    @classmethod
+    def from_values(cls, values):
+        """Statistiques d'un tableau de valeurs (calcul vectorisé)"""
+        values = np.asarray(values, dtype=float)
+        if len(values) == 0:
+            return cls()
+        mean = float(values.mean())
+        return cls(len(values), mean, float(((values - mean) ** 2).sum()))
+
+    def update(self, value):
+        """Cumule une valeur"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other):
+        """Fusionne (en place) les statistiques d'une autre partition"""
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        return self
+
+    @property
+    def total(self):
+        return self.mean * self.count
+
+    @property
+    def variance(self):
+        """Variance d'échantillon (ddof=1), NaN avec moins de deux valeurs"""
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self):
+        return math.sqrt(max(self.variance, 0.0)) if self.count > 1 else math.nan
+
+    def copy(self):
+        return RunningStats(self.count, self.mean, self.m2)
+
+    def to_dict(self):
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(int(data['count']), float(data['mean']), float(data['m2']))
+
+
+class OnlineCategoryStats:
+    """Statistiques en ligne des dépenses (valeur absolue) par catégorie et par jour de semaine
+
+    Mises à jour transaction par transaction (``update``) ou par lot
+    (``update_frame``), fusionnables entre partitions ou processus
+    (``merge``) et sérialisables en JSON (``save`` / ``load``). Les jours de
+    semaine sont numérotés de 0 (lundi) à 6 (dimanche).
+    """
+
+    def __init__(self):
+        self.by_category = {}
+        self.by_weekday = {}
+
+    @classmethod
+    def from_transactions(cls, df):
+        """Statistiques d'un relevé au schéma standard"""
+        stats = cls()
+        stats.update_frame(df)
+        return stats
+
+    def update(self, categorie, date, montant):
+        """Cumule une transaction en O(1) (les revenus sont ignorés)"""
+        if montant >= 0:
+            return
+        amount = -float(montant)
+        if categorie is not None and not pd.isna(categorie):
+            self.by_category.setdefault(categorie, RunningStats()).update(amount)
+        self.by_weekday.setdefault(pd.Timestamp(date).dayofweek, RunningStats()).update(amount)
+
+    def update_frame(self, df):
+        """Cumule un lot : statistiques du lot par groupe, fusionnées aux accumulateurs"""
+        depenses = df[df['montant'].to_numpy() < 0]
+        if depenses.empty:
+            return
+        amounts = depenses['montant'].abs()
+        for keys, groups in ((depenses['categorie'], self.by_category),
+                             (depenses['date'].dt.dayofweek, self.by_weekday)):
+            batch = amounts.groupby(keys, observed=True, sort=False).agg(['count', 'mean', 'var'])
+            m2 = batch['var'].fillna(0.0) * (batch['count'] - 1)
+            for key, count, mean, key_m2 in zip(batch.index, batch['count'], batch['mean'], m2):
+                key = int(key) if groups is self.by_weekday else key
+                groups.setdefault(key, RunningStats()).merge(RunningStats(int(count), float(mean), float(key_m2)))
+
+    def merge(self, other):
+        """Fusionne (en place) les statistiques d'une autre partition"""
+        for groups, other_groups in ((self.by_category, other.by_category),
+                                     (self.by_weekday, other.by_weekday)):
+            for key, stats in other_groups.items():
+                groups.setdefault(key, RunningStats()).merge(stats)
+        return self
+
+    def copy(self):
+        other = OnlineCategoryStats()
+        other.by_category = {key: stats.copy() for key, stats in self.by_category.items()}
+        other.by_weekday = {key: stats.copy() for key, stats in self.by_weekday.items()}
+        return other
+
+    @staticmethod
+    def _frame(groups, name):
+        keys = sorted(groups)
+        return pd.DataFrame({
+            'count': np.array([groups[key].count for key in keys], dtype=np.int64),
+            'sum': [groups[key].total for key in keys],
+            'mean': [groups[key].mean for key in keys],
+            'std': [groups[key].std for key in keys]
+        }, index=pd.Index(keys, name=name))
+
+    def category_frame(self):
+        """Nombre, somme, moyenne et écart-type (ddof=1) par catégorie"""
+        return self._frame(self.by_category, 'categorie')
+
+    def weekday_frame(self):
+        """Nombre, somme, moyenne et écart-type (ddof=1) par jour de semaine (0 = lundi)"""
+        return self._frame(self.by_weekday, 'jour_semaine')
+
+    def thresholds(self, n_sigma=2, min_count=6):
+        """Seuils d'anomalie ``moyenne + n_sigma * écart-type`` des catégories d'au moins ``min_count`` dépenses"""
+        return pd.Series({
+            key: stats.mean + n_sigma * stats.std
+            for key, stats in self.by_category.items()
+            if stats.count >= min_count
+        }, dtype=float)
+
+    def to_dict(self):
+        return {
+            'by_category': {key: stats.to_dict() for key, stats in self.by_category.items()},
+            'by_weekday': {str(key): stats.to_dict() for key, stats in self.by_weekday.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.by_category = {key: RunningStats.from_dict(value) for key, value in data['by_category'].items()}
+        stats.by_weekday = {int(key): RunningStats.from_dict(value) for key, value in data['by_weekday'].items()}
+        return stats
+
+    def save(self, path):
+        """Sauvegarde JSON (écriture atomique)"""
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(temporary, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """Relit des statistiques sauvegardées par ``save``"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+
+# Périodes prédéfinies proposées dans la sidebar
+PREDEFINED_PERIODS = [
+    'all', 'current_month', 'last_month', 'last_3months', 'last_6months',
+    'current_year', 'last_year', 'last_12months'
+]
+
+
+def period_bounds(period='all', current_date=None, date_range=None):
+    """Bornes inclusives ``(debut, fin)`` d'une période, ``None`` pour une borne ouverte
+
+    ``current_date`` est la date la plus récente des données : les périodes
+    relatives ('current_month', 'last_3months'...) sont calculées à partir
+    d'elle, exactement comme dans ``AnalysisEngine._apply_period_filter``.
+    """
+    if period == 'custom':
+        if date_range is None:
+            return None, None
+        start_date, end_date = date_range
+        # Comparaison au jour près : toute la journée de fin est incluse
+        return (
+            pd.Timestamp(start_date),
+            pd.Timestamp(end_date) + pd.Timedelta(days=1) - pd.Timedelta(1, unit='ns')
+        )
+
+    if period == 'all' or current_date is None:
+        return None, None
+
+    current_date = pd.Timestamp(current_date)
+
+    if period == 'current_month':
+        return current_date.replace(day=1), None
+    if period == 'last_month':
+        # Mois précédent complet
+        start_of_current = current_date.replace(day=1)
+        end_of_last = start_of_current - timedelta(days=1)
+        return end_of_last.replace(day=1), end_of_last
+    if period == 'last_3months':
+        return current_date - timedelta(days=90), None
+    if period == 'last_6months':
+        return current_date - timedelta(days=180), None
+    if period == 'current_year':
+        return current_date.replace(month=1, day=1), None
+    if period == 'last_year':
+        last_year = current_date.year - 1
+        return (
+            current_date.replace(year=last_year, month=1, day=1),
+            current_date.replace(year=last_year, month=12, day=31)
+        )
+    if period == 'last_12months':
+        return current_date - timedelta(days=365), None
+
+    return None, None
+
+
+def day_bounds(start, end):
+    """Premier et dernier numéros de jour compris dans les bornes inclusives ``(start, end)``
+
+    Une borne absente donne ``None``.
+    """
+    one_day = pd.Timedelta(days=1)
+    epoch = pd.Timestamp('1970-01-01')
+    first_day = last_day = None
+    if start is not None:
+        # Premier jour dont minuit est >= start
+        first_day = -((epoch - pd.Timestamp(start)) // one_day)
+    if end is not None:
+        # Dernier jour dont minuit est <= end
+        last_day = (pd.Timestamp(end) - epoch) // one_day
+    return first_day, last_day
+
+
+def date_slice(dates, start, end):
+    """Positions ``(debut, fin)`` des lignes comprises dans les bornes inclusives ``(start, end)``
+
+    ``dates`` est le tableau trié des dates (``datetime64``) : deux
+    recherches dichotomiques sur les bornes exactes (heure comprise)
+    suffisent et les lignes retenues forment la tranche contiguë
+    ``debut:fin``, identique au masque ``(date >= start) & (date <= end)``.
+    """
+    lo, hi = 0, len(dates)
+    if start is not None:
+        lo = int(np.searchsorted(dates, pd.Timestamp(start).to_datetime64(), side='left'))
+    if end is not None:
+        hi = int(np.searchsorted(dates, pd.Timestamp(end).to_datetime64(), side='right'))
+    return lo, max(lo, hi)
@@ -0,0 +1,190 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# Compression par défaut : environ compression / 2 centroïdes par esquisse
+DEFAULT_COMPRESSION = 200
+
+
+class TDigest:
+    """Esquisse de quantiles t-digest (variante par fusion de Dunning)
+
+    Les valeurs sont cumulées dans un tampon puis fusionnées en centroïdes
+    (moyenne, poids) dont la taille est bornée par la fonction d'échelle
+    k1 : précis aux extrémités, mémoire en O(compression) quelle que soit la
+    longueur de la série. Deux esquisses de partitions différentes se
+    fusionnent (``merge``). Tant qu'aucune compression n'a eu lieu, les
+    quantiles sont exacts (interpolation linéaire, comme ``numpy.quantile``).
+    """
+
+    def __init__(self, compression=DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer = []
+        self._buffer_size = 5 * compression
+
+    @property
+    def count(self):
+        self._flush()
+        return float(self.weights.sum())
+
+    def update(self, value, weight=1.0):
+        """Cumule une valeur (O(1) amorti)"""
+        value = float(value)
+        self._buffer.append((value, float(weight)))
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= self._buffer_size:
+            self._flush()
+
+    def update_many(self, values):
+        """Cumule un tableau de valeurs"""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._compress(np.concatenate([self.means, self._buffered_means(), values]),
+                       np.concatenate([self.weights, self._buffered_weights(), np.ones(len(values))]))
+        self._buffer = []
+
+    def merge(self, other):
+        """Fusionne (en place) l'esquisse d'une autre partition"""
+        other._flush()
+        self._flush()
+        if len(other.weights):
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._compress(np.concatenate([self.means, other.means]),
+                           np.concatenate([self.weights, other.weights]))
+        return self
+
+    def copy(self):
+        self._flush()
+        other = TDigest(self.compression)
+        other.means = self.means.copy()
+        other.weights = self.weights.copy()
+        other.min, other.max = self.min, self.max
+        return other
+
+    def _buffered_means(self):
+        return np.array([value for value, _ in self._buffer], dtype=float)
+
+    def _buffered_weights(self):
+        return np.array([weight for _, weight in self._buffer], dtype=float)
+
+    def _flush(self):
+        if self._buffer:
+            self._compress(np.concatenate([self.means, self._buffered_means()]),
+                           np.concatenate([self.weights, self._buffered_weights()]))
+            self._buffer = []
+
+    def _compress(self, means, weights):
+        """Fusionne des centroïdes triés tant que leur poids respecte la fonction d'échelle k1"""
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        if len(means) <= self.compression:
+            self.means, self.weights = means, weights
+            return
+
+        # k1(q) = compression / (2 pi) * asin(2q - 1) : un centroïde couvre au plus une unité de k
+        def k_scale(q):
+            return self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+        merged_means, merged_weights = [means[0]], [weights[0]]
+        cumulated = 0.0
+        k_limit = k_scale(0.0) + 1
+        for mean, weight in zip(means[1:], weights[1:]):
+            candidate = merged_weights[-1] + weight
+            if k_scale((cumulated + candidate) / total) <= k_limit:
+                merged_means[-1] += (mean - merged_means[-1]) * weight / candidate
+                merged_weights[-1] = candidate
+            else:
+                cumulated += merged_weights[-1]
+                k_limit = k_scale(cumulated / total) + 1
+                merged_means.append(mean)
+                merged_weights.append(weight)
+        self.means = np.array(merged_means)
+        self.weights = np.array(merged_weights)
+
+    def quantile(self, q):
+        """Quantile ``q`` (entre 0 et 1), NaN si l'esquisse est vide"""
+        self._flush()
+        if len(self.weights) == 0:
+            return math.nan
+        total = self.weights.sum()
+        if len(self.weights) == 1 or total <= 1:
+            return float(self.means[0])
+
+        # Positions des centres de centroïdes ; min et max ancrés aux extrémités
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.5], centers, [total - 0.5]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(0.5 + q * (total - 1), positions, values))
+
+    def iqr_bounds(self, factor=1.5):
+        """Bornes ``(Q1 - factor * IQR, Q3 + factor * IQR)`` de la règle de Tukey"""
+        q1, q3 = self.quantile(0.25), self.quantile(0.75)
+        iqr = q3 - q1
+        return q1 - factor * iqr, q3 + factor * iqr
+
+
+class QuantileSketches:
+    """Esquisses t-digest par clé (catégorie, compte, ou couple compte × catégorie)
+
+    ``keys`` nomme les colonnes qui forment la clé ; les valeurs esquissées
+    sont les montants de dépense en valeur absolue.
+    """
+
+    def __init__(self, keys=('categorie',), compression=DEFAULT_COMPRESSION):
+        self.keys = tuple(keys)
+        self.compression = compression
+        self.sketches = {}
+
+    @classmethod
+    def from_transactions(cls, df, keys=('categorie',), compression=DEFAULT_COMPRESSION):
+        sketches = cls(keys, compression)
+        sketches.update_frame(df)
+        return sketches
+
+    def update_frame(self, df):
+        """Cumule les dépenses d'un lot dans l'esquisse de leur clé"""
+        depenses = df[df['montant'].to_numpy() < 0]
+        if depenses.empty:
+            return
+        amounts = depenses['montant'].abs()
+        by_key = amounts.groupby([depenses[key] for key in self.keys], observed=True, sort=False)
+        for key, values in by_key:
+            key = key[0] if len(self.keys) == 1 and isinstance(key, tuple) else key
+            self.sketches.setdefault(key, TDigest(self.compression)).update_many(values.to_numpy())
+
+    def merge(self, other):
+        """Fusionne (en place) les esquisses d'une autre partition"""
+        for key, sketch in other.sketches.items():
+            self.sketches.setdefault(key, TDigest(self.compression)).merge(sketch)
+        return self
+
+    def copy(self):
+        other = QuantileSketches(self.keys, self.compression)
+        other.sketches = {key: sketch.copy() for key, sketch in self.sketches.items()}
+        return other
+
+    def iqr_frame(self, factor=1.5):
+        """Q1, Q3 et bornes d'anomalie de chaque clé"""
+        rows = {}
+        for key, sketch in self.sketches.items():
+            lower, upper = sketch.iqr_bounds(factor)
+            rows[key] = {'count': int(sketch.count), 'q1': sketch.quantile(0.25), 'q3': sketch.quantile(0.75),
+                         'seuil_bas': lower, 'seuil_haut': upper}
+        frame = pd.DataFrame.from_dict(rows, orient='index')
+        if len(self.keys) > 1 and len(frame):
+            frame.index = pd.MultiIndex.from_tuples(frame.index, names=self.keys)
+        else:
+            frame.index.name = self.keys[0]
+        return frame.sort_index()
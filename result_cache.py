@@ -0,0 +1,99 @@
+import copy
+import functools
+import inspect
+import sys
+
+import numpy as np
+import pandas as pd
+
+from lru_cache import LRUCache
+
+# Budget mémoire par défaut du cache de résultats (octets)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def estimate_size(value):
+    """Taille mémoire approximative (octets) d'un résultat d'analyse"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        size = value.memory_usage(deep=True)
+        return int(size.sum()) if isinstance(size, pd.Series) else int(size)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if hasattr(value, '__dict__'):
+        return sys.getsizeof(value) + estimate_size(vars(value))
+    return sys.getsizeof(value)
+
+
+def freeze_key(value):
+    """Rend hachable un argument de méthode (listes, dicts) pour l'utiliser dans une clé"""
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_key(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze_key(item)) for key, item in value.items()))
+    if isinstance(value, set):
+        return tuple(sorted(freeze_key(item) for item in value))
+    return value
+
+
+class ResultCache(LRUCache):
+    """Cache LRU de résultats d'analyse borné par un budget mémoire, partagé entre sessions
+
+    Les clés incluent la version du jeu de données : un nouveau jeu de
+    données ne réutilise jamais les résultats d'un autre.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        super().__init__(max_bytes)
+
+    def _entry_size(self, entry):
+        return entry[1]
+
+    def get_or_compute(self, key, compute):
+        """Retourne le résultat associé à ``key``, en appelant ``compute()`` si absent"""
+        with self._lock:
+            entry = self._get_entry(key)
+            if entry is not None:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Calcul hors verrou : deux sessions peuvent calculer la même clé en
+        # parallèle, la seconde écrase simplement la première
+        value = compute()
+        with self._lock:
+            self._set_entry(key, (value, estimate_size(value)))
+        return value
+
+    def stats(self):
+        """Statistiques d'utilisation du cache (budget et occupation en octets)"""
+        return dict(super().stats(), octets=self.current_size)
+
+
+# Cache partagé au niveau du processus : il survit aux reruns Streamlit et
+# sert toutes les sessions (le module n'est importé qu'une fois)
+SHARED_RESULT_CACHE = ResultCache()
+
+
+def memoized(method):
+    """Mémoïse une méthode d'``AnalysisEngine`` par (version, méthode, arguments)
+
+    Le résultat mis en cache est partagé : l'appelant en reçoit une copie
+    profonde et peut la modifier sans affecter les autres sessions.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        # Arguments normalisés : f('all') et f(period='all') partagent la même clé
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = tuple((name, freeze_key(value)) for name, value in bound.arguments.items()
+                          if name != 'self')
+        key = (self.version, method.__name__, arguments)
+        result = self.result_cache.get_or_compute(key, lambda: method(self, *args, **kwargs))
+        return copy.deepcopy(result)
+    return wrapper
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+# Colonnes textuelles stockées en catégories (quelques dizaines de valeurs distinctes)
+CATEGORICAL_COLUMNS = ['description', 'categorie', 'mois_nom', 'jour_semaine', 'type_transaction']
+
+# Colonnes temporelles dérivées, stockées sur des entiers courts
+SMALL_INT_COLUMNS = {
+    'annee': 'int16',
+    'mois': 'int8',
+    'semaine': 'int8',
+    'trimestre': 'int8'
+}
+
+EPOCH = np.datetime64('1970-01-01', 'D')
+
+
+# Colonnes recalculables à partir de ``date`` et ``montant`` (jamais persistées)
+DERIVED_COLUMNS = ['annee', 'mois', 'mois_nom', 'jour_semaine', 'semaine', 'trimestre', 'type_transaction']
+
+
+MONTH_NAMES = np.array(['January', 'February', 'March', 'April', 'May', 'June', 'July',
+                        'August', 'September', 'October', 'November', 'December'], dtype=object)
+DAY_NAMES = np.array(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],
+                     dtype=object)
+
+
+def add_time_columns(df, categorical=False):
+    """Ajoute (en place) les colonnes temporelles dérivées de ``date``
+
+    Avec ``categorical=True``, ``mois_nom`` et ``jour_semaine`` sont créées
+    directement en catégories (sans matérialiser une chaîne par ligne).
+    """
+    dates = df['date'].dt
+    df['annee'] = dates.year
+    df['mois'] = dates.month
+    month_codes = df['mois'].to_numpy() - 1
+    day_codes = dates.dayofweek.to_numpy()
+    if categorical:
+        df['mois_nom'] = pd.Categorical.from_codes(month_codes, MONTH_NAMES)
+        df['jour_semaine'] = pd.Categorical.from_codes(day_codes, DAY_NAMES)
+    else:
+        df['mois_nom'] = MONTH_NAMES.take(month_codes)
+        df['jour_semaine'] = DAY_NAMES.take(day_codes)
+    df['semaine'] = dates.isocalendar().week
+    df['trimestre'] = dates.quarter
+    return df
+
+
+def add_derived_columns(df, categorical=False):
+    """Ajoute (en place) toutes les colonnes dérivées de ``date`` et ``montant``"""
+    add_time_columns(df, categorical)
+    if categorical:
+        df['type_transaction'] = pd.Categorical.from_codes(
+            (df['montant'].to_numpy() <= 0).astype(np.int8), ['Crédit', 'Débit']
+        )
+    else:
+        df['type_transaction'] = np.where(df['montant'] > 0, 'Crédit', 'Débit')
+    return df
+
+
+def is_compact(df):
+    """Indique si le DataFrame utilise le schéma compact (jours entiers, centimes)"""
+    return 'montant_cents' in df.columns
+
+
+def to_compact(df):
+    """Convertit un DataFrame traité vers le schéma compact
+
+    - ``date`` -> ``jour`` : numéro de jour int32 depuis 1970-01-01
+    - ``montant`` -> ``montant_cents`` : centimes en int64 (virgule fixe)
+    - colonnes textuelles -> ``category``, colonnes temporelles -> int8/int16
+    """
+    if is_compact(df):
+        return df
+
+    compact = pd.DataFrame(index=df.index)
+    for column in df.columns:
+        if column == 'date':
+            compact['jour'] = to_day_numbers(df['date'])
+        elif column == 'montant':
+            compact['montant_cents'] = np.round(df['montant'].to_numpy(dtype=float) * 100).astype(np.int64)
+        elif column in CATEGORICAL_COLUMNS:
+            compact[column] = df[column].astype('category')
+        elif column in SMALL_INT_COLUMNS:
+            compact[column] = df[column].astype(SMALL_INT_COLUMNS[column])
+        else:
+            compact[column] = df[column]
+
+    return compact
+
+
+def to_standard(df):
+    """Vue au schéma standard (``date`` datetime, ``montant`` en euros)
+
+    Les colonnes catégorielles et entières restent compactes ; seules
+    ``date`` et ``montant`` sont reconstruites. Sans effet (et sans copie) sur
+    un DataFrame déjà au schéma standard.
+    """
+    if not is_compact(df):
+        return df
+
+    standard = df.drop(columns=['jour', 'montant_cents'])
+    standard.insert(0, 'date', get_dates(df))
+    standard.insert(2 if 'description' in standard.columns else 1, 'montant', get_amounts(df))
+    return standard
+
+
+def to_day_numbers(dates):
+    """Numéros de jour int32 (jours depuis 1970-01-01) d'une Series de dates"""
+    return (pd.to_datetime(dates).to_numpy().astype('datetime64[D]') - EPOCH).astype(np.int32)
+
+
+def get_dates(df):
+    """Dates d'un DataFrame, quel que soit son schéma"""
+    if 'date' in df.columns:
+        return df['date']
+    dates = (EPOCH + df['jour'].to_numpy().astype('timedelta64[D]')).astype('datetime64[ns]')
+    return pd.Series(dates, index=df.index, name='date')
+
+
+def get_amounts(df):
+    """Montants en euros d'un DataFrame, quel que soit son schéma"""
+    if 'montant' in df.columns:
+        return df['montant']
+    return pd.Series(df['montant_cents'].to_numpy() / 100, index=df.index, name='montant')
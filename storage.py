@@ -0,0 +1,326 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from schema import CATEGORICAL_COLUMNS, DERIVED_COLUMNS, add_derived_columns
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Version du format persisté, écrite dans les métadonnées de chaque fichier
+STORAGE_SCHEMA_VERSION = 1
+METADATA_KEY = b'assistant_epargne'
+
+DEFAULT_COLUMNAR_FILE = 'releve_bancaire_fictif.parquet'
+
+
+def _file_format(filename):
+    """Format déduit de l'extension ('parquet' ou 'feather')"""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == '.parquet':
+        return 'parquet'
+    if extension in ('.feather', '.arrow'):
+        return 'feather'
+    raise ValueError(f"Extension non supportée pour le stockage colonnaire : {filename}")
+
+
+def _require_pyarrow():
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow est requis pour le stockage colonnaire (Parquet/Feather)")
+
+
+def to_arrow_table(df):
+    """Table Arrow persistée : colonnes de base uniquement, textes en dictionnaire
+
+    Les colonnes dérivées (``annee``, ``mois``, ``semaine``...) ne sont pas
+    stockées : elles sont recalculées au chargement si on les demande.
+    """
+    _require_pyarrow()
+    base = df.drop(columns=[col for col in DERIVED_COLUMNS if col in df.columns])
+    for column in CATEGORICAL_COLUMNS:
+        if column in base.columns and not isinstance(base[column].dtype, pd.CategoricalDtype):
+            base[column] = base[column].astype('category')
+
+    table = pa.Table.from_pandas(base, preserve_index=False)
+
+    # Types normalisés : des segments écrits séparément restent concaténables
+    fields = []
+    for field in table.schema:
+        if pa.types.is_timestamp(field.type):
+            field = field.with_type(pa.timestamp('ns'))
+        elif pa.types.is_dictionary(field.type):
+            field = field.with_type(pa.dictionary(pa.int32(), pa.string()))
+        fields.append(field)
+    table = table.cast(pa.schema(fields, metadata=table.schema.metadata))
+
+    metadata = dict(table.schema.metadata or {})
+    metadata[METADATA_KEY] = json.dumps({
+        'schema_version': STORAGE_SCHEMA_VERSION,
+        'columns': list(base.columns)
+    }).encode('utf-8')
+    return table.replace_schema_metadata(metadata)
+
+
+def save_columnar(df, filename=DEFAULT_COLUMNAR_FILE):
+    """Sauvegarde un DataFrame traité au format Parquet ou Feather"""
+    table = to_arrow_table(df)
+    if _file_format(filename) == 'parquet':
+        pq.write_table(table, filename)
+    else:
+        feather.write_feather(table, filename)
+    return filename
+
+
+def read_metadata(filename):
+    """Métadonnées applicatives d'un fichier colonnaire (version de schéma, colonnes)"""
+    _require_pyarrow()
+    if _file_format(filename) == 'parquet':
+        schema = pq.read_schema(filename)
+    else:
+        with pa.memory_map(filename) as source:
+            schema = pa.ipc.open_file(source).schema
+    raw = (schema.metadata or {}).get(METADATA_KEY)
+    if raw is None:
+        return {'schema_version': None, 'columns': schema.names}
+    return json.loads(raw)
+
+
+def load_columnar(filename=DEFAULT_COLUMNAR_FILE, columns=None):
+    """Charge un fichier colonnaire, en ne lisant que les colonnes demandées
+
+    Les colonnes dérivées demandées sont recalculées à partir de ``date`` et
+    ``montant`` (lues en plus si nécessaire, puis retirées).
+    """
+    metadata = read_metadata(filename)
+    if metadata['schema_version'] != STORAGE_SCHEMA_VERSION:
+        raise ValueError(
+            f"Version de schéma {metadata['schema_version']} incompatible "
+            f"(attendue : {STORAGE_SCHEMA_VERSION}) pour {filename}"
+        )
+
+    to_read, derived, wanted = _plan_columns(metadata['columns'], columns)
+    if _file_format(filename) == 'parquet':
+        df = pd.read_parquet(filename, columns=to_read)
+    else:
+        df = pd.read_feather(filename, columns=to_read)
+
+    return _finish_columns(df, derived, wanted)
+
+
+def _plan_columns(stored, columns):
+    """Colonnes à lire, colonnes dérivées à recalculer et ordre final demandé"""
+    wanted = stored + DERIVED_COLUMNS if columns is None else list(columns)
+    derived = [col for col in wanted if col in DERIVED_COLUMNS]
+    to_read = [col for col in wanted if col in stored]
+    if derived:
+        to_read += [col for col in ('date', 'montant') if col not in to_read]
+    return to_read, derived, wanted
+
+
+def _finish_columns(df, derived, wanted):
+    """Recalcule les colonnes dérivées puis applique la projection demandée"""
+    if derived:
+        add_derived_columns(df, categorical=True)
+    return df[[col for col in wanted if col in df.columns]]
+
+
+# Colonnes minimales d'une transaction brute à ingérer
+REQUIRED_COLUMNS = ['date', 'description', 'montant']
+
+DEFAULT_STORE_DIR = 'donnees_transactions'
+MANIFEST_FILE = 'manifest.json'
+
+
+class TransactionStore:
+    """Jeu de données partitionné par mois (annee=AAAA/mois=MM), alimenté par ajouts successifs
+
+    Chaque ajout (``append``) ne valide et ne catégorise que les nouvelles
+    lignes, les écrit dans un nouveau segment et incrémente ``version`` :
+    les caches en aval savent ainsi que les données ont changé.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR):
+        self.root = root
+        self.manifest_path = os.path.join(root, MANIFEST_FILE)
+
+    def exists(self):
+        """Indique si le jeu de données a déjà été initialisé"""
+        return os.path.exists(self.manifest_path)
+
+    def read_manifest(self):
+        """Manifeste courant (version, segments)"""
+        if not self.exists():
+            return {'schema_version': STORAGE_SCHEMA_VERSION, 'version': 0, 'columns': [], 'segments': []}
+        with open(self.manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest['schema_version'] != STORAGE_SCHEMA_VERSION:
+            raise ValueError(
+                f"Version de schéma {manifest['schema_version']} incompatible "
+                f"(attendue : {STORAGE_SCHEMA_VERSION}) pour {self.root}"
+            )
+        return manifest
+
+    @property
+    def version(self):
+        """Version du jeu de données, incrémentée à chaque écriture"""
+        return self.read_manifest()['version']
+
+    def date_max(self):
+        """Date de la transaction la plus récente, lue dans le manifeste (sans charger les données)"""
+        dates = [segment['date_max'] for segment in self.read_manifest()['segments'] if segment['date_max']]
+        return max(pd.Timestamp(date) for date in dates) if dates else None
+
+    def _write_manifest(self, manifest):
+        # Écriture atomique : un lecteur ne voit jamais un manifeste partiel
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    @staticmethod
+    def validate(df):
+        """Vérifie et normalise un lot de transactions brutes (lève ValueError si invalide)"""
+        missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+        if missing:
+            raise ValueError(f"Colonnes manquantes : {', '.join(missing)}")
+
+        batch = df.copy()
+        try:
+            batch['date'] = pd.to_datetime(batch['date'])
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Dates invalides : {e}")
+        batch['montant'] = pd.to_numeric(batch['montant'], errors='coerce')
+
+        if batch['date'].isna().any():
+            raise ValueError("Dates manquantes dans le lot")
+        if not np.isfinite(batch['montant'].to_numpy(dtype=float)).all():
+            raise ValueError("Montants manquants ou non numériques dans le lot")
+        if batch['description'].isna().any():
+            raise ValueError("Descriptions manquantes dans le lot")
+
+        return batch
+
+    def write(self, df):
+        """Remplace tout le contenu par ``df`` (un seul segment)
+
+        Le nouveau jeu est écrit dans un répertoire voisin puis substitué à
+        l'ancien par renommage : une écriture interrompue laisse l'ancien
+        jeu intact.
+        """
+        staging = TransactionStore(self.root + '.tmp')
+        retired = self.root + '.old'
+        for leftover in (staging.root, retired):
+            if os.path.isdir(leftover):
+                shutil.rmtree(leftover)
+        os.makedirs(staging.root)
+        version = staging._add_segment(staging.read_manifest(), df)
+
+        if os.path.isdir(self.root):
+            os.replace(self.root, retired)
+        os.replace(staging.root, self.root)
+        shutil.rmtree(retired, ignore_errors=True)
+        return version
+
+    def append(self, df, generator=None):
+        """Ajoute un lot de nouvelles transactions et retourne la nouvelle version
+
+        Seul le lot est validé et catégorisé (``generator.process_data``) ;
+        le coût est proportionnel à sa taille, pas à celle de l'historique.
+        """
+        if generator is None:
+            from data_generator import DataGenerator
+            generator = DataGenerator()
+
+        batch = self.validate(df)
+        if batch.empty:
+            return self.version
+        if 'categorie' not in batch.columns:
+            batch = generator.process_data(batch)
+
+        manifest = self.read_manifest()
+        stored_columns = [col for col in batch.columns if col not in DERIVED_COLUMNS]
+        if manifest['columns'] and stored_columns != manifest['columns']:
+            raise ValueError(
+                f"Colonnes du lot ({', '.join(stored_columns)}) différentes de celles "
+                f"du jeu de données ({', '.join(manifest['columns'])})"
+            )
+
+        os.makedirs(self.root, exist_ok=True)
+        return self._add_segment(manifest, batch)
+
+    def _add_segment(self, manifest, df):
+        """Écrit ``df`` comme une nouvelle version, découpée en partitions annee=AAAA/mois=MM"""
+        version = manifest['version'] + 1
+        manifest['version'] = version
+
+        for partition, part in _split_by_month(df):
+            year, month = partition.split('-')
+            filename = os.path.join(f'annee={year}', f'mois={month}', f'segment-{version:06d}.parquet')
+            os.makedirs(os.path.join(self.root, os.path.dirname(filename)), exist_ok=True)
+            table = to_arrow_table(part)
+            pq.write_table(table, os.path.join(self.root, filename))
+
+            manifest['columns'] = manifest['columns'] or json.loads(table.schema.metadata[METADATA_KEY])['columns']
+            manifest['segments'].append({
+                'file': filename,
+                'partition': partition,
+                'version': version,
+                'rows': len(part),
+                'date_min': str(part['date'].min()),
+                'date_max': str(part['date'].max())
+            })
+
+        self._write_manifest(manifest)
+        return version
+
+    def load(self, columns=None):
+        """Charge le jeu de données trié par date, avec projection de colonnes
+
+        Les périodes d'analyse ne sont pas filtrées ici : le tableau de bord a
+        besoin de tout l'historique (synthèse mensuelle, prédictions) et
+        ``AnalysisEngine`` découpe ensuite chaque période sur ses dates triées.
+        """
+        _require_pyarrow()
+        manifest = self.read_manifest()
+        to_read, derived, wanted = _plan_columns(manifest['columns'], columns)
+
+        tables = [
+            pq.read_table(os.path.join(self.root, segment['file']), columns=to_read)
+            for segment in manifest['segments']
+        ]
+        if not tables:
+            return pd.DataFrame(columns=wanted)
+
+        # Unification des dictionnaires : les catégories restent des catégories
+        df = pa.concat_tables(tables).unify_dictionaries().to_pandas()
+        if 'date' in df.columns and not df['date'].is_monotonic_increasing:
+            df = df.sort_values('date', kind='stable').reset_index(drop=True)
+
+        return _finish_columns(df, derived, wanted)
+
+
+def _split_by_month(df):
+    """Découpe un DataFrame en (partition 'AAAA-MM', sous-DataFrame) sans trier s'il l'est déjà"""
+    if df.empty:
+        return []
+    codes = (df['date'].dt.year * 100 + df['date'].dt.month).to_numpy()
+    if not (np.diff(codes) >= 0).all():
+        order = np.argsort(codes, kind='stable')
+        df = df.iloc[order]
+        codes = codes[order]
+
+    boundaries = np.flatnonzero(np.diff(codes)) + 1
+    starts = np.concatenate([[0], boundaries])
+    stops = np.concatenate([boundaries, [len(codes)]])
+    return [
+        (f'{codes[lo] // 100:04d}-{codes[lo] % 100:02d}', df.iloc[lo:hi])
+        for lo, hi in zip(starts, stops)
+    ]
@@ -0,0 +1,59 @@
+"""Comportements de référence de la version d'origine, comparés aux chemins optimisés"""
+from datetime import timedelta
+
+import pandas as pd
+
+
+def baseline_period_mask(df, period, date_range=None):
+    """Masque de période de la version d'origine d'``_apply_period_filter``"""
+    dates = df['date']
+    if period == 'custom':
+        start_date, end_date = date_range
+        return (dates.dt.date >= start_date) & (dates.dt.date <= end_date)
+    if period == 'all':
+        return pd.Series(True, index=df.index)
+
+    current_date = dates.max()
+    if period == 'current_month':
+        return dates >= current_date.replace(day=1)
+    if period == 'last_month':
+        end_of_last = current_date.replace(day=1) - timedelta(days=1)
+        return (dates >= end_of_last.replace(day=1)) & (dates <= end_of_last)
+    if period == 'last_3months':
+        return dates >= current_date - timedelta(days=90)
+    if period == 'last_6months':
+        return dates >= current_date - timedelta(days=180)
+    if period == 'current_year':
+        return dates >= current_date.replace(month=1, day=1)
+    if period == 'last_year':
+        last_year = current_date.year - 1
+        return ((dates >= current_date.replace(year=last_year, month=1, day=1))
+                & (dates <= current_date.replace(year=last_year, month=12, day=31)))
+    return dates >= current_date - timedelta(days=365)
+
+
+def baseline_categorize(categories_depenses, description):
+    """Catégorisation ligne à ligne de la version d'origine (``categorize_expense``)"""
+    description = description.upper()
+    if any(keyword in description for keyword in ['SALAIRE', 'VIREMENT', 'REMBOURSEMENT']):
+        return 'Revenus'
+    for categorie, keywords in categories_depenses.items():
+        for keyword in keywords:
+            if keyword.upper() in description:
+                return categorie
+    return 'Autre'
+
+
+def baseline_monthly_summary(df):
+    """Résumé mensuel de la version d'origine de ``get_monthly_summary``"""
+    monthly = df.groupby(['annee', 'mois']).agg({'montant': ['sum', 'count']}).round(2)
+    monthly.columns = ['total', 'nb_transactions']
+    monthly = monthly.reset_index()
+    monthly['periode'] = monthly.apply(lambda x: f"{int(x['annee'])}-{int(x['mois']):02d}", axis=1)
+
+    monthly_income = df[df['montant'] > 0].groupby(['annee', 'mois'])['montant'].sum()
+    monthly_expenses = df[df['montant'] < 0].groupby(['annee', 'mois'])['montant'].sum().abs()
+    monthly['revenus'] = monthly.apply(lambda x: monthly_income.get((x['annee'], x['mois']), 0), axis=1)
+    monthly['depenses'] = monthly.apply(lambda x: monthly_expenses.get((x['annee'], x['mois']), 0), axis=1)
+    monthly['solde'] = monthly['revenus'] - monthly['depenses']
+    return monthly
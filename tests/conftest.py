@@ -0,0 +1,43 @@
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Modules à plat à la racine du dépôt
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_generator import DataGenerator
+from result_cache import ResultCache
+
+
+@pytest.fixture(scope='session')
+def generator():
+    return DataGenerator()
+
+
+@pytest.fixture(scope='session')
+def transactions(generator):
+    """Relevé catégorisé reproductible (dates à minuit)"""
+    df = generator.generate_transactions(3000, datetime(2022, 1, 1), datetime(2024, 6, 20),
+                                         vectorized=True, seed=7)
+    return generator.process_data(df)
+
+
+@pytest.fixture(scope='session')
+def timestamped_transactions(transactions):
+    """Même relevé avec une heure de la journée sur chaque transaction"""
+    df = transactions.copy()
+    rng = np.random.default_rng(3)
+    df['date'] = df['date'] + pd.to_timedelta(rng.integers(0, 24 * 60, len(df)), unit='min')
+    # Dernière transaction à 10h30 : les bornes relatives portent cette heure
+    df.loc[df.index[-1], 'date'] = df['date'].iloc[-1].normalize() + pd.Timedelta(hours=10, minutes=30)
+    return df.sort_values('date', kind='stable').reset_index(drop=True)
+
+
+@pytest.fixture
+def result_cache():
+    """Cache de résultats isolé : aucun test ne lit les résultats d'un autre"""
+    return ResultCache()
@@ -0,0 +1,8 @@
+"""Séries hebdomadaires synthétiques partagées par les tests de prévision"""
+import numpy as np
+
+
+def weekly_series(nb_points, seed=0):
+    rng = np.random.default_rng(seed)
+    weeks = np.arange(nb_points)
+    return 400 + 60 * np.sin(2 * np.pi * weeks / 52) + rng.normal(0, 40, nb_points)
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import DailyCategoryCube, FenwickTree
+
+
+@pytest.fixture(scope='module')
+def expenses(transactions):
+    return transactions[transactions['montant'] < 0]
+
+
+@pytest.fixture(scope='module')
+def cube(transactions):
+    return DailyCategoryCube.from_transactions(transactions)
+
+
+def test_category_stats_match_groupby(cube, expenses):
+    expected = expenses.groupby('categorie')['montant'].agg(['count', 'sum', 'mean', 'std'])
+    stats = cube.category_stats().loc[expected.index]
+
+    np.testing.assert_array_equal(stats['count'], expected['count'])
+    np.testing.assert_allclose(stats['sum'], expected['sum'], atol=1e-6)
+    np.testing.assert_allclose(stats['mean'], expected['mean'], atol=1e-6)
+    np.testing.assert_allclose(stats['std'], expected['std'], atol=1e-6)
+
+
+def test_weekly_and_monthly_rollups_match_resample(cube, expenses):
+    daily = expenses.groupby(expenses['date'].dt.date)['montant'].sum().abs()
+    daily.index = pd.to_datetime(daily.index)
+    for freq, rule in (('W', 'W'), ('M', 'ME')):
+        expected = daily.resample(rule).sum()
+        np.testing.assert_allclose(cube.period_expenses(freq).to_numpy(), expected.to_numpy(), atol=1e-6)
+        assert list(cube.period_expenses(freq).index) == list(expected.index)
+
+
+def test_monthly_by_category_matches_pivot(cube, expenses):
+    expected = expenses.pivot_table(index=expenses['date'].dt.to_period('M'), columns='categorie',
+                                    values='montant', aggfunc='sum', fill_value=0).abs()
+    result = cube.monthly_by_category()
+    np.testing.assert_allclose(result[expected.columns].to_numpy(), expected.to_numpy(), atol=1e-6)
+    assert list(result.index) == list(expected.index)
+
+
+def test_incremental_add_matches_full_build(transactions):
+    cutoff = pd.Timestamp('2023-09-14')
+    cube = DailyCategoryCube.from_transactions(transactions[transactions['date'] < cutoff])
+    # Cumuls et index construits avant l'ajout : ils sont mis à jour en place
+    cube.rollup('M'), cube.category_totals(), cube.range_totals()
+    cube.add_transactions(transactions[transactions['date'] >= cutoff])
+    full = DailyCategoryCube.from_transactions(transactions)
+
+    pd.testing.assert_frame_equal(cube.category_totals(), full.category_totals(), atol=1e-6)
+    pd.testing.assert_frame_equal(cube.range_totals(cutoff, None), full.range_totals(cutoff, None), atol=1e-6)
+    pd.testing.assert_frame_equal(cube.monthly_flows(), full.monthly_flows(), atol=1e-6)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_range_stats_match_groupby_on_random_windows(cube, expenses, seed):
+    rng = np.random.default_rng(seed)
+    days = pd.date_range(expenses['date'].min(), expenses['date'].max(), freq='D')
+    start, end = sorted(rng.choice(days, 2, replace=False))
+    window = expenses[(expenses['date'] >= start) & (expenses['date'] <= end)]
+    expected = window.groupby('categorie')['montant'].agg(['count', 'sum'])
+
+    stats = cube.range_stats(start, end)
+    assert sorted(stats.index) == sorted(expected.index)
+    np.testing.assert_array_equal(stats.loc[expected.index, 'count'], expected['count'])
+    np.testing.assert_allclose(stats.loc[expected.index, 'sum'], expected['sum'], atol=1e-6)
+
+    flows = cube.range_flows(start, end)
+    assert flows['nb_debits'] == len(window)
+    np.testing.assert_allclose(flows['debits'], window['montant'].sum(), atol=1e-6)
+
+
+def test_fenwick_tree_matches_cumulative_sums():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(37, 3))
+    tree = FenwickTree(values[:20])
+    tree.append(values[20:])
+    rows = rng.integers(0, 37, 15)
+    deltas = rng.normal(size=(15, 3))
+    tree.add(rows, deltas)
+    np.add.at(values, rows, deltas)
+
+    prefix = np.vstack([np.zeros(3), np.cumsum(values, axis=0)])
+    for lo, hi in [(0, 37), (0, 0), (5, 6), (3, 30), (19, 21)]:
+        np.testing.assert_allclose(tree.range_sum(lo, hi), prefix[hi] - prefix[lo], atol=1e-9)
@@ -0,0 +1,104 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis_engine import AnalysisEngine
+from periods import PREDEFINED_PERIODS
+from result_cache import ResultCache
+from tests.baseline import baseline_monthly_summary, baseline_period_mask
+
+
+@pytest.fixture
+def engine(transactions, result_cache):
+    return AnalysisEngine(transactions, result_cache=result_cache)
+
+
+def test_sorted_base_frame_is_shared_without_copy(transactions, engine):
+    assert engine.df is transactions
+
+    montants = transactions['montant'].to_numpy()
+    # Les sous-ensembles sont extraits une seule fois par moteur
+    assert engine.depenses_df is engine.depenses_df
+    for period in PREDEFINED_PERIODS:
+        period_df = engine.for_period(period).df
+        assert np.shares_memory(period_df['montant'].to_numpy(), montants)
+    assert engine.for_period('last_month') is engine.for_period('last_month')
+
+
+def test_monthly_summary_matches_original(transactions, engine):
+    expected = baseline_monthly_summary(transactions)
+    result = engine.get_monthly_summary()
+
+    assert list(result.columns) == list(expected.columns)
+    assert result['periode'].tolist() == expected['periode'].tolist()
+    np.testing.assert_array_equal(result['nb_transactions'], expected['nb_transactions'])
+    for column in ('total', 'revenus', 'depenses', 'solde'):
+        np.testing.assert_allclose(result[column], expected[column], atol=1e-6)
+
+
+@pytest.mark.parametrize('split', ['day', 'row'])
+def test_append_matches_rebuild(transactions, result_cache, split):
+    # Lot commençant un jour nouveau, ou au milieu d'un jour déjà connu
+    position = len(transactions) - 150
+    if split == 'day':
+        position = int(np.searchsorted(transactions['date'].to_numpy(), transactions['date'].to_numpy()[position]))
+    history, batch = transactions.iloc[:position], transactions.iloc[position:]
+    assert (split == 'row') == (history['date'].iloc[-1] == batch['date'].iloc[0])
+    engine = AnalysisEngine(history, result_cache=result_cache)
+    # Agrégats construits avant l'ajout : ils sont prolongés, pas recalculés
+    engine.get_monthly_summary(), engine.online_stats, engine.daily_spending_stats
+    engine.append_transactions(batch)
+    rebuilt = AnalysisEngine(transactions.copy(), result_cache=ResultCache())
+
+    assert engine.df['date'].tolist() == rebuilt.df['date'].tolist()
+    pd.testing.assert_frame_equal(engine.get_monthly_summary(), rebuilt.get_monthly_summary(), atol=1e-6)
+    pd.testing.assert_frame_equal(engine.get_category_analysis('last_month'),
+                                  rebuilt.get_category_analysis('last_month'))
+    pd.testing.assert_frame_equal(engine.online_stats.category_frame(),
+                                  rebuilt.online_stats.category_frame(), atol=1e-6)
+    pd.testing.assert_frame_equal(engine.online_stats.weekday_frame(),
+                                  rebuilt.online_stats.weekday_frame(), atol=1e-6)
+    appended, full = engine.daily_spending_stats, rebuilt.daily_spending_stats
+    assert appended.count == full.count
+    assert appended.mean == pytest.approx(full.mean) and appended.std == pytest.approx(full.std)
+
+
+def test_daily_spending_stats_match_original_alert_average(transactions, engine):
+    expenses = transactions[transactions['montant'] < 0]
+    daily = expenses.groupby(expenses['date'].dt.date)['montant'].sum().abs()
+
+    stats = engine.daily_spending_stats
+    assert stats.count == len(daily)
+    assert stats.mean == pytest.approx(daily.mean())
+    assert stats.std == pytest.approx(daily.std())
+
+
+@pytest.mark.parametrize('period,date_range', [(period, None) for period in PREDEFINED_PERIODS]
+                         + [('custom', (date(2023, 2, 10), date(2023, 5, 3)))])
+def test_period_summary_matches_row_filter(transactions, engine, period, date_range):
+    rows = transactions[baseline_period_mask(transactions, period, date_range)]
+    debits, credits = rows[rows['montant'] < 0], rows[rows['montant'] > 0]
+
+    summary = engine.get_period_summary(period, date_range)
+
+    assert summary['nb_transactions'] == len(rows)
+    assert (summary['nb_depenses'], summary['nb_revenus']) == (len(debits), len(credits))
+    assert summary['total_depenses'] == pytest.approx(abs(debits['montant'].sum()))
+    assert summary['total_revenus'] == pytest.approx(credits['montant'].sum())
+    expected = debits.groupby('categorie')['montant'].sum().abs().round(2)
+    categories = summary['categories']['total_depense']
+    pd.testing.assert_series_equal(categories.sort_index(), expected.sort_index(), check_names=False)
+
+
+def test_switching_periods_is_a_lookup(engine, monkeypatch):
+    calls = []
+    summarize = AnalysisEngine._period_summary
+    monkeypatch.setattr(AnalysisEngine, '_period_summary',
+                        lambda self, start, end: calls.append((start, end)) or summarize(self, start, end))
+
+    for period in PREDEFINED_PERIODS + PREDEFINED_PERIODS:
+        engine.get_period_summary(period)
+    # Une seule passe pour toutes les périodes, puis des lectures
+    assert len(calls) == len(PREDEFINED_PERIODS)
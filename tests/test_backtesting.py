@@ -0,0 +1,45 @@
+import pandas as pd
+
+from backtesting import backtest, rolling_origins, summarize
+from tests.series import weekly_series
+
+
+def scores_frame(rows):
+    return pd.DataFrame(rows, columns=['serie', 'origine', 'methode', 'mae', 'mape', 'couverture', 'latence_ms'])
+
+
+def test_rolling_origins_leave_a_full_horizon():
+    assert rolling_origins(30, horizon=4, min_train=20) == list(range(20, 27))
+    assert rolling_origins(30, horizon=4, min_train=20, step=3) == [20, 23, 26]
+
+
+def test_methods_are_compared_on_common_origins():
+    # 'holt_winters' n'est scorée que sur les dernières origines, où la
+    # moyenne mobile fait mieux : sa MAE globale plus faible ne compte pas
+    rows = [('total', origin, 'moving_average', 10.0 if origin < 28 else 2.0, 5.0, 1.0, 0.1)
+            for origin in range(20, 31)]
+    rows += [('total', origin, 'holt_winters', 5.0, 3.0, 1.0, 20.0) for origin in range(28, 31)]
+
+    report = summarize(scores_frame(rows)).set_index('methode')
+
+    assert report.loc['holt_winters', 'mae'] < report.loc['moving_average', 'mae']
+    assert report.loc['moving_average', 'mae_commune'] == 2.0
+    assert report['nb_origines_communes'].tolist() == [3, 3]
+    assert report.loc['moving_average', 'recommandee'] and not report.loc['holt_winters', 'recommandee']
+
+    # Hors budget de latence, 'holt_winters' n'est plus candidate : toutes les origines comptent
+    budgeted = summarize(scores_frame(rows), latency_budget_ms=1.0).set_index('methode')
+    assert budgeted.loc['moving_average', 'nb_origines_communes'] == 11
+    assert budgeted.loc['holt_winters', 'nb_origines_communes'] == 0
+
+
+def test_parallel_backtest_matches_sequential():
+    series = {'a': weekly_series(40, 1), 'b': weekly_series(36, 2)}
+    methods = ('holt', 'moving_average')
+
+    sequential = backtest(series, methods=methods, n_workers=1)
+    parallel = backtest(series, methods=methods, n_workers=2)
+
+    columns = ['serie', 'origine', 'methode', 'mae', 'mape', 'couverture']
+    pd.testing.assert_frame_equal(sequential[columns], parallel[columns])
+    assert len(sequential) == 2 * (len(rolling_origins(40)) + len(rolling_origins(36)))
@@ -0,0 +1,61 @@
+import pickle
+
+import pandas as pd
+
+from categorizer import CategoryCache, KeywordCategorizer
+from tests.baseline import baseline_categorize
+
+EXTRA_DESCRIPTIONS = [
+    'remboursement carrefour', '  Netflix  ', 'VIREMENT SALAIRE ENTREPRISE',
+    'PHARMACIE DU CENTRE PARIS', 'Achat inconnu', ''
+]
+
+
+def descriptions(generator):
+    merchants = [merchant for merchants in generator.categories_depenses.values() for merchant in merchants]
+    return pd.Series(merchants + [m + ' LYON' for m in merchants] + EXTRA_DESCRIPTIONS, dtype=object)
+
+
+def test_compiled_patterns_match_original_loop(generator):
+    categorizer = KeywordCategorizer(generator.categories_depenses, cache=CategoryCache())
+    series = descriptions(generator)
+
+    expected = [baseline_categorize(generator.categories_depenses, d) for d in series]
+    assert categorizer.categorize_series(series).tolist() == expected
+    assert [categorizer.categorize(d) for d in series] == expected
+
+
+def test_cache_is_keyed_on_normalized_description(generator):
+    cache = CategoryCache()
+    categorizer = KeywordCategorizer(generator.categories_depenses, cache=cache)
+
+    first = categorizer.categorize_series(pd.Series(['Netflix.com', 'CARREFOUR CITY', 'Netflix.com']))
+    assert cache.stats()['misses'] == 2 and cache.stats()['hits'] == 0
+
+    assert first.tolist() == ['Abonnements', 'Courses', 'Abonnements']
+    second = categorizer.categorize_series(pd.Series([' netflix.com ', 'carrefour city']))
+    assert second.tolist() == first.tolist()[:2]
+    assert cache.stats()['hits'] == 2
+
+
+def test_cache_is_bounded_and_separates_keyword_tables(generator):
+    cache = CategoryCache(max_size=3)
+    categorizer = KeywordCategorizer(generator.categories_depenses, cache=cache)
+    categorizer.categorize_series(pd.Series(['A', 'B', 'C', 'D', 'NETFLIX.COM']))
+    assert cache.stats()['taille'] == 3
+
+    other = KeywordCategorizer({'Streaming': ['NETFLIX']}, cache=cache)
+    assert other.categorize('NETFLIX.COM') == 'Streaming'
+    assert categorizer.categorize('NETFLIX.COM') == 'Abonnements'
+
+
+def test_pickled_cache_keeps_its_size_but_not_its_entries(generator):
+    cache = CategoryCache(max_size=10)
+    cache.put_many([('clé', 'Courses')])
+
+    restored = pickle.loads(pickle.dumps(cache))
+
+    assert restored.capacity == 10
+    assert restored.stats()['taille'] == 0
+    restored.put_many([('clé', 'Loisirs')])
+    assert restored.get_many(['clé']) == {'clé': 'Loisirs'}
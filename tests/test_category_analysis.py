@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis_engine import AnalysisEngine
+from periods import PREDEFINED_PERIODS
+from tests.baseline import baseline_period_mask
+
+
+def baseline_category_analysis(df, period):
+    """Analyse par catégorie de la version d'origine (groupby sur les dépenses filtrées)"""
+    depenses = df[df['montant'] < 0]
+    depenses = depenses[baseline_period_mask(depenses, period)]
+    stats = depenses.groupby('categorie', observed=True)['montant'].agg(['count', 'sum', 'mean', 'std'])
+    stats['cents'] = (depenses['montant'] * 100).round().groupby(depenses['categorie'], observed=True).sum()
+    return stats
+
+
+@pytest.mark.parametrize('period', PREDEFINED_PERIODS)
+def test_category_analysis_matches_grouped_statistics(transactions, period, result_cache):
+    engine = AnalysisEngine(transactions, result_cache=result_cache)
+    expected = baseline_category_analysis(transactions, period)
+
+    analysis = engine.get_category_analysis(period).reindex(expected.index)
+
+    assert (analysis['nb_transactions'].to_numpy() == expected['count'].to_numpy()).all()
+    np.testing.assert_array_equal(analysis['total_depense'].to_numpy(), expected['sum'].abs().round(2).to_numpy())
+    np.testing.assert_allclose(analysis['ecart_type'].to_numpy(), expected['std'].round(2).to_numpy(), atol=0.011)
+
+    # Moyenne : centimes entiers divisés par le nombre de dépenses, demi-centime au pair
+    half_even = np.round(expected['cents'].to_numpy() / expected['count'].to_numpy()) / 100
+    np.testing.assert_array_equal(analysis['moyenne'].to_numpy(), half_even)
+    # Seuls les demi-centimes exacts peuvent s'écarter de l'arrondi du groupby d'origine
+    ties = (2 * expected['cents'].to_numpy()) % expected['count'].to_numpy() == 0
+    differs = analysis['moyenne'].to_numpy() != expected['mean'].round(2).to_numpy()
+    assert not (differs & ~ties).any()
+    np.testing.assert_allclose(analysis['moyenne'].to_numpy(), expected['mean'].round(2).to_numpy(), atol=0.0101)
+
+
+def test_half_cent_mean_rounds_to_even_cent(result_cache):
+    df = pd.DataFrame({
+        'date': pd.to_datetime(['2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05']),
+        'description': ['A', 'B', 'C', 'D'],
+        'montant': [-16.48, -50.47, -10.00, -10.01],
+        'categorie': ['Abonnements', 'Abonnements', 'Courses', 'Courses']
+    })
+
+    analysis = AnalysisEngine(df, result_cache=result_cache).get_category_analysis()
+
+    # -66.95 / 2 = -33.475 -> -33.48 ; -20.01 / 2 = -10.005 -> -10.00
+    assert analysis.loc['Abonnements', 'moyenne'] == -33.48
+    assert analysis.loc['Courses', 'moyenne'] == -10.0
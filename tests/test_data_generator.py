@@ -0,0 +1,81 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+START, END = datetime(2023, 1, 1), datetime(2023, 12, 31)
+
+
+def test_vectorized_columns_match_row_by_row(generator):
+    rows = generator.generate_transactions(200, START, END)
+    vectorized = generator.generate_transactions(200, START, END, vectorized=True, seed=1)
+
+    assert list(vectorized.columns) == list(rows.columns)
+    assert vectorized['date'].dtype == np.dtype('datetime64[ns]')
+    assert vectorized['montant'].dtype == rows['montant'].dtype
+    assert vectorized['date'].is_monotonic_increasing
+    # Un salaire par mois en plus des dépenses
+    assert len(vectorized) == len(rows) == 200 + 12
+
+
+def test_vectorized_draws_follow_category_ranges(generator):
+    df = generator.process_data(
+        generator.generate_transactions(5000, START, END, vectorized=True, seed=2)
+    )
+
+    assert df['date'].between(pd.Timestamp(START), pd.Timestamp(END)).all()
+    salaries = df[df['categorie'] == 'Revenus']
+    assert salaries['montant'].between(2800, 3500).all()
+    assert (salaries['date'].dt.day >= 28).all()
+
+    expenses = -df.loc[df['montant'] < 0, 'montant']
+    lows, highs = zip(*generator.montants_ranges.values())
+    assert expenses.between(min(lows), max(highs)).all()
+    np.testing.assert_array_equal(expenses, expenses.round(2))
+    assert len(expenses) == 5000
+
+
+@pytest.mark.parametrize('seed', [0, 42])
+def test_vectorized_seed_is_reproducible(generator, seed):
+    first = generator.generate_transactions(1000, START, END, vectorized=True, seed=seed)
+    second = generator.generate_transactions(1000, START, END, vectorized=True, seed=seed)
+    pd.testing.assert_frame_equal(first, second)
+
+
+@pytest.mark.parametrize('chunk_size', [97, 1000, 5000])
+def test_chunks_form_one_chronological_history(generator, chunk_size):
+    chunks = list(generator.iter_transaction_chunks(3000, chunk_size, START, END, seed=3))
+    df = pd.concat(chunks, ignore_index=True)
+
+    assert all(len(chunk) <= chunk_size + 12 for chunk in chunks)
+    assert len(df) == 3000 + 12
+    assert df['date'].is_monotonic_increasing
+    assert (df['description'] == 'VIREMENT SALAIRE ENTREPRISE').sum() == 12
+
+
+@pytest.mark.parametrize('extension', ['csv', 'parquet'])
+def test_saved_chunks_read_back_whole(generator, tmp_path, extension):
+    if extension == 'parquet':
+        pytest.importorskip('pyarrow')
+    chunks = list(generator.iter_transaction_chunks(1000, 300, START, END, seed=4))
+    filename = generator.save_chunks(iter(chunks), str(tmp_path / f'releve.{extension}'))
+
+    saved = pd.read_csv(filename, parse_dates=['date']) if extension == 'csv' else pd.read_parquet(filename)
+    expected = pd.concat(chunks, ignore_index=True)
+    assert saved['date'].tolist() == expected['date'].tolist()
+    np.testing.assert_allclose(saved['montant'], expected['montant'])
+
+
+def test_accounts_do_not_depend_on_worker_count(generator):
+    sequential = generator.generate_accounts(3, 200, START, END, base_seed=5, n_workers=1)
+    parallel = generator.generate_accounts(3, 200, START, END, base_seed=5, n_workers=2)
+
+    pd.testing.assert_frame_equal(sequential, parallel)
+    assert sequential['account_id'].unique().tolist() == [0, 1, 2]
+    # Graines distinctes par compte
+    first, second = (sequential[sequential['account_id'] == i].reset_index(drop=True) for i in (0, 1))
+    assert not first['montant'].equals(second['montant'])
+
+    alone = generator.generate_accounts(2, 200, START, END, base_seed=5, n_workers=1)
+    pd.testing.assert_frame_equal(alone, sequential[sequential['account_id'] < 2])
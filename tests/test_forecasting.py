@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+import forecasting
+from forecasting import MIN_POINTS, STATSMODELS_AVAILABLE, choose_method, forecast
+from tests.series import weekly_series
+
+
+@pytest.mark.parametrize('nb_points', [10, 15, MIN_POINTS['arima'] - 1])
+def test_auto_without_budget_keeps_moving_average_below_arima_minimum(nb_points):
+    assert choose_method(nb_points) == 'moving_average'
+    assert forecast(weekly_series(nb_points))['method'] == 'moving_average'
+
+
+@pytest.mark.skipif(not STATSMODELS_AVAILABLE, reason='statsmodels absent')
+def test_auto_without_budget_uses_arima_from_its_minimum():
+    assert choose_method(MIN_POINTS['arima']) == 'arima'
+    assert choose_method(200) == 'arima'
+
+
+def test_auto_without_budget_falls_back_to_moving_average(monkeypatch):
+    def failing_arima(*args, **kwargs):
+        raise RuntimeError('échec')
+    monkeypatch.setattr(forecasting, 'arima_forecast', failing_arima)
+    monkeypatch.setattr(forecasting, 'STATSMODELS_AVAILABLE', True)
+
+    assert forecast(weekly_series(60))['method'] == 'moving_average'
+
+
+def test_moving_average_matches_original_formula():
+    y = weekly_series(15)
+    recent_avg = y[-8:].mean()
+    trend = (y[-4:].mean() - y[:4].mean()) / len(y)
+
+    result = forecast(y, periods=4, method='moving_average')
+
+    expected = [max(recent_avg + trend * i, 0) for i in range(1, 5)]
+    np.testing.assert_allclose(result['predictions'], expected)
+
+
+@pytest.mark.skipif(not hasattr(forecasting.signal, 'setitimer'), reason='SIGALRM absent')
+def test_series_timeout_falls_back_to_faster_method(monkeypatch):
+    def slow_arima(*args, **kwargs):
+        forecasting.time.sleep(5)
+    monkeypatch.setattr(forecasting, 'arima_forecast', slow_arima)
+    monkeypatch.setattr(forecasting, 'STATSMODELS_AVAILABLE', True)
+
+    started = forecasting.time.perf_counter()
+    result = forecasting._forecast_series(weekly_series(60), 4, 'arima', None,
+                                          forecasting.DEFAULT_SEASON_LENGTH, 0.95, 0.2)
+
+    assert forecasting.time.perf_counter() - started < 2
+    assert result['success'] and result['timed_out']
+    assert result['method'] != 'arima'
+
+
+def test_batch_matches_serial_forecasts():
+    series = np.vstack([weekly_series(30, seed) for seed in range(3)])
+
+    results = forecasting.forecast_batch(series, method='holt', max_workers=2)
+
+    assert list(results) == [(0,), (1,), (2,)]
+    for (row,), result in results.items():
+        assert result['success'] and not result['timed_out']
+        expected = forecast(series[row], method='holt')
+        np.testing.assert_allclose(result['predictions'], expected['predictions'])
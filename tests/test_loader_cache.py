@@ -0,0 +1,67 @@
+import os
+
+import pandas as pd
+import pytest
+
+import loader_cache
+from loader_cache import DigestMemo, LoaderCache, file_fingerprint
+
+
+def touch(path, content, mtime_ns):
+    path.write_text(content)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_fingerprint_follows_file_changes(tmp_path):
+    path = tmp_path / 'releve.csv'
+    touch(path, 'date,montant\n', 10**18)
+    first = file_fingerprint(path)
+    assert file_fingerprint(path) == first
+
+    touch(path, 'date,montant\n2024-01-01,-12.5\n', 2 * 10**18)
+    second = file_fingerprint(path)
+    assert second[1:] != first[1:]
+
+
+def test_digest_memo_keeps_one_entry_per_path(tmp_path, monkeypatch):
+    memo = DigestMemo(max_entries=2)
+    monkeypatch.setattr(loader_cache, '_digest_memo', memo)
+
+    path = tmp_path / 'releve.csv'
+    for version in range(5):
+        touch(path, f'version {version}\n', (version + 1) * 10**18)
+        file_fingerprint(path)
+    assert memo.stats()['taille'] == 1
+
+    for name in ('a.csv', 'b.csv', 'c.csv'):
+        touch(tmp_path / name, name, 10**18)
+        file_fingerprint(tmp_path / name)
+    assert memo.stats()['taille'] == 2
+
+    # Fichier inchangé : l'empreinte est servie sans relecture
+    hits = memo.hits
+    file_fingerprint(tmp_path / 'c.csv')
+    assert memo.hits == hits + 1
+
+
+def test_loader_cache_shares_frozen_frames_and_evicts():
+    cache = LoaderCache(max_entries=2)
+    calls = []
+
+    def loader(key):
+        def load():
+            calls.append(key)
+            return pd.DataFrame({'montant': [1.0, -2.0]})
+        return load
+
+    first = cache.get_or_load('a', loader('a'))
+    assert cache.get_or_load('a', loader('a')) is first
+    assert cache.key_for(first) == 'a'
+    with pytest.raises(ValueError):
+        first['montant'].to_numpy()[0] = 3.0
+
+    cache.get_or_load('b', loader('b'))
+    cache.get_or_load('c', loader('c'))
+    cache.get_or_load('a', loader('a'))
+    assert calls == ['a', 'b', 'c', 'a']
+    assert cache.stats()['hits'] == 1
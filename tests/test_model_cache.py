@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from forecasting import forecast
+from model_cache import ForecastModelCache
+from tests.series import weekly_series
+
+
+@pytest.fixture
+def model_cache(tmp_path):
+    return ForecastModelCache(str(tmp_path / 'modeles'))
+
+
+@pytest.mark.parametrize('method', ['holt', 'moving_average'])
+def test_same_series_is_served_from_cache(model_cache, method):
+    y = weekly_series(60)
+    first = forecast(y, 4, method, model_cache=model_cache)
+    again = forecast(y, 4, method, model_cache=model_cache)
+    longer = forecast(y, 8, method, model_cache=model_cache)
+
+    assert (first['fit'], again['fit'], longer['fit']) == ('full', 'cache', 'warm')
+    assert again['predictions'] == first['predictions']
+    np.testing.assert_allclose(longer['predictions'][:4], first['predictions'])
+
+
+@pytest.mark.parametrize('method', ['holt', 'moving_average'])
+def test_appended_or_revised_last_week_warm_starts(model_cache, method):
+    y = weekly_series(60)
+    forecast(y, 4, method, model_cache=model_cache)
+
+    appended = np.append(y, 420.0)
+    # Dernière semaine incomplète révisée au chargement suivant : l'état
+    # arrêté avant le dernier point sert de départ
+    revised = np.append(y[:-1], y[-1] + 35.0)
+    for series in (appended, revised):
+        warm = forecast(series, 4, method, model_cache=model_cache)
+        assert warm['fit'] == 'warm'
+        np.testing.assert_allclose(warm['predictions'], forecast(series, 4, method)['predictions'], rtol=1e-6)
+
+
+def test_models_are_reloaded_from_disk(model_cache):
+    y = weekly_series(60)
+    first = forecast(y, 4, 'holt', model_cache=model_cache)
+
+    reloaded = forecast(y, 4, 'holt', model_cache=ForecastModelCache(model_cache.directory))
+    assert reloaded['fit'] == 'cache'
+    assert reloaded['predictions'] == first['predictions']
+
+
+def test_persisted_files_are_pruned(tmp_path):
+    model_cache = ForecastModelCache(str(tmp_path / 'modeles'), max_files=10)
+    for seed in range(15):
+        forecast(weekly_series(30, seed), 4, 'moving_average', model_cache=model_cache)
+
+    files = [name for name in (tmp_path / 'modeles').iterdir() if name.suffix == '.json']
+    assert len(files) <= 10
+    assert model_cache.lookup('moving_average', weekly_series(30, 14), 4, 0.95)[0] == 'cache'
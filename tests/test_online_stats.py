@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from online_stats import OnlineCategoryStats, RunningStats
+
+
+def test_running_stats_merge_matches_numpy():
+    rng = np.random.default_rng(0)
+    values = rng.normal(50, 20, 1000)
+
+    streamed = RunningStats()
+    for value in values[:300]:
+        streamed.update(value)
+    merged = streamed.merge(RunningStats.from_values(values[300:]))
+
+    assert merged.count == len(values)
+    np.testing.assert_allclose(merged.mean, values.mean())
+    np.testing.assert_allclose(merged.std, values.std(ddof=1))
+    assert np.isnan(RunningStats.from_values([3.0]).std)
+
+
+def test_category_stats_match_groupby(transactions):
+    expenses = transactions[transactions['montant'] < 0]
+    expected = expenses['montant'].abs().groupby(expenses['categorie']).agg(['count', 'sum', 'mean', 'std'])
+
+    stats = OnlineCategoryStats.from_transactions(transactions).category_frame()
+    pd.testing.assert_frame_equal(stats, expected, check_dtype=False, check_names=False, atol=1e-6)
+
+
+def test_row_updates_batches_and_merges_agree(transactions, tmp_path):
+    half = len(transactions) // 2
+    by_batch = OnlineCategoryStats.from_transactions(transactions)
+
+    by_row = OnlineCategoryStats()
+    for row in transactions.iloc[:half].itertuples(index=False):
+        by_row.update(row.categorie, row.date, row.montant)
+    by_row.merge(OnlineCategoryStats.from_transactions(transactions.iloc[half:]))
+
+    path = str(tmp_path / 'stats.json')
+    by_row.save(path)
+    reloaded = OnlineCategoryStats.load(path)
+    for frame in ('category_frame', 'weekday_frame'):
+        pd.testing.assert_frame_equal(getattr(reloaded, frame)(), getattr(by_batch, frame)(), atol=1e-6)
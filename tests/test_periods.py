@@ -0,0 +1,37 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from analysis_engine import AnalysisEngine
+from periods import PREDEFINED_PERIODS
+from tests.baseline import baseline_period_mask
+
+
+@pytest.mark.parametrize('fixture', ['transactions', 'timestamped_transactions'])
+@pytest.mark.parametrize('period', PREDEFINED_PERIODS)
+def test_period_filter_matches_baseline_mask(request, fixture, period, result_cache):
+    df = request.getfixturevalue(fixture)
+    engine = AnalysisEngine(df, result_cache=result_cache)
+
+    expected = df[baseline_period_mask(df, period)]
+    filtered = engine.for_period(period).df
+
+    assert len(filtered) == len(expected)
+    pd.testing.assert_series_equal(filtered['date'].reset_index(drop=True),
+                                   expected['date'].reset_index(drop=True))
+
+
+@pytest.mark.parametrize('date_range', [
+    (date(2023, 3, 5), date(2023, 6, 20)),
+    (date(2024, 6, 1), date(2024, 6, 1)),
+    (date(2021, 1, 1), date(2022, 1, 1)),
+])
+def test_custom_period_includes_whole_days(timestamped_transactions, date_range, result_cache):
+    df = timestamped_transactions
+    engine = AnalysisEngine(df, result_cache=result_cache)
+
+    filtered = engine.for_period('custom', date_range).df
+
+    assert len(filtered) == int(baseline_period_mask(df, 'custom', date_range).sum())
+
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis_engine import AnalysisEngine
+from quantile_sketch import QuantileSketches, TDigest
+
+
+def test_tdigest_quantiles_are_close_to_exact():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(3, 0.8, 20_000)
+    sketch = TDigest()
+    sketch.update_many(values[:5000])
+    other = TDigest()
+    for value in values[5000:6000]:
+        other.update(value)
+    other.update_many(values[6000:])
+    sketch.merge(other)
+
+    assert sketch.count == len(values)
+    spread = np.quantile(values, 0.99) - np.quantile(values, 0.01)
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+        assert abs(sketch.quantile(q) - np.quantile(values, q)) < 0.01 * spread
+    assert np.isnan(TDigest().quantile(0.5))
+
+
+def test_small_sketches_are_exact():
+    values = np.array([12.0, 3.0, 7.5, 40.0, 9.0])
+    sketch = TDigest()
+    sketch.update_many(values)
+    for q in (0.0, 0.25, 0.5, 0.75, 1.0):
+        assert sketch.quantile(q) == pytest.approx(np.quantile(values, q))
+
+
+def test_iqr_bounds_follow_pandas_quantiles(transactions, result_cache):
+    engine = AnalysisEngine(transactions, result_cache=result_cache)
+    expenses = transactions[transactions['montant'] < 0]
+
+    daily = expenses.groupby(expenses['date'].dt.date)['montant'].sum().abs()
+    q1, q3 = daily.quantile(0.25), daily.quantile(0.75)
+    lower, upper = engine.daily_spending_sketch.iqr_bounds(1.5)
+    assert upper == pytest.approx(q3 + 1.5 * (q3 - q1), rel=0.02)
+    assert lower == pytest.approx(q1 - 1.5 * (q3 - q1), abs=0.02 * daily.max())
+
+    frame = engine.category_sketches.iqr_frame()
+    amounts = expenses['montant'].abs().groupby(expenses['categorie'])
+    pd.testing.assert_series_equal(frame['count'], amounts.size(), check_names=False, check_dtype=False)
+    np.testing.assert_allclose(frame['q3'], amounts.quantile(0.75).loc[frame.index], rtol=0.02)
+
+
+def test_sketches_by_key_merge_like_one_pass(transactions):
+    half = len(transactions) // 2
+    merged = QuantileSketches.from_transactions(transactions.iloc[:half])
+    merged.merge(QuantileSketches.from_transactions(transactions.iloc[half:]))
+    whole = QuantileSketches.from_transactions(transactions)
+
+    pd.testing.assert_series_equal(merged.iqr_frame()['count'], whole.iqr_frame()['count'])
+    np.testing.assert_allclose(merged.iqr_frame()['q1'], whole.iqr_frame()['q1'], rtol=0.02)
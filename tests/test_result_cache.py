@@ -0,0 +1,51 @@
+import pandas as pd
+
+from analysis_engine import AnalysisEngine, dataset_version
+from result_cache import ResultCache
+
+
+def test_memoized_results_are_shared_but_copied(transactions, result_cache):
+    engine = AnalysisEngine(transactions, result_cache=result_cache)
+    first = engine.get_category_analysis('last_3months')
+    hits = result_cache.hits
+
+    second = AnalysisEngine(transactions, result_cache=result_cache).get_category_analysis(period='last_3months')
+    assert result_cache.hits == hits + 1
+    pd.testing.assert_frame_equal(first, second)
+
+    # L'appelant reçoit une copie : la modifier n'altère pas le cache
+    second.iloc[:, :] = 0
+    pd.testing.assert_frame_equal(engine.get_category_analysis('last_3months'), first)
+
+
+def test_dataset_version_follows_every_analysed_column(transactions):
+    version = dataset_version(transactions)
+    assert dataset_version(transactions.copy()) == version
+
+    for column, value in (('montant', -1.0), ('categorie', 'Autre'), ('description', 'X'),
+                          ('date', pd.Timestamp('2020-01-01'))):
+        changed = transactions.copy()
+        changed.loc[changed.index[10], column] = value
+        assert dataset_version(changed) != version, column
+
+
+def test_recategorized_dataset_does_not_reuse_results(transactions, result_cache):
+    before = AnalysisEngine(transactions, result_cache=result_cache).get_category_analysis()
+
+    recategorized = transactions.copy()
+    recategorized['categorie'] = recategorized['categorie'].replace('Courses', 'Autre')
+    after = AnalysisEngine(recategorized, result_cache=result_cache).get_category_analysis()
+
+    assert 'Courses' in before.index and 'Courses' not in after.index
+
+
+def test_byte_budget_evicts_least_recently_used():
+    cache = ResultCache(max_bytes=3 * 8000 + 1000)
+    for key in 'abcd':
+        cache.get_or_compute(key, lambda: pd.Series(range(1000), dtype='int64').to_numpy())
+
+    assert cache.stats()['taille'] == 3
+    assert cache.stats()['octets'] <= cache.capacity
+    calls = []
+    cache.get_or_compute('a', lambda: calls.append('a'))
+    assert calls == ['a']
@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+
+from analysis_engine import AnalysisEngine
+
+
+def baseline_outliers(expenses):
+    """Dépenses au-dessus de moyenne + 2 écarts-types de leur catégorie (boucle d'origine)"""
+    flagged = []
+    for category in expenses['categorie'].unique():
+        amounts = expenses.loc[expenses['categorie'] == category, 'montant'].abs()
+        if len(amounts) > 5:
+            flagged.extend(amounts[amounts > amounts.mean() + 2 * amounts.std()].index)
+    return set(flagged)
+
+
+def subscriptions(generator, amounts):
+    df = pd.DataFrame({
+        'date': pd.date_range('2024-01-05', periods=len(amounts), freq='MS') + pd.Timedelta(days=4),
+        'description': 'NETFLIX.COM',
+        'montant': amounts
+    })
+    return generator.process_data(df)
+
+
+def test_std_outliers_match_original_loop(transactions, result_cache):
+    engine = AnalysisEngine(transactions, result_cache=result_cache)
+    expected = baseline_outliers(engine.depenses_df)
+
+    unusual = engine._find_unusual_expenses('std', top_k=len(transactions))
+    keys = {(row['date'], row['description'], row['montant']) for row in unusual}
+    assert len(unusual) == len(expected)
+    assert keys == {tuple(row) for row in engine.depenses_df.loc[sorted(expected), ['date', 'description', 'montant']]
+                    .itertuples(index=False)}
+
+    # Les k premières sont les plus forts dépassements
+    top = engine._find_unusual_expenses('std', top_k=3)
+    assert [row['montant'] for row in top] == [row['montant'] for row in unusual[:3]]
+
+
+@pytest.mark.parametrize('method', ['std', 'mad'])
+def test_constant_category_flags_nothing(generator, result_cache, method):
+    engine = AnalysisEngine(subscriptions(generator, [-9.99] * 12), result_cache=result_cache)
+    assert engine._find_unusual_expenses(method) == []
+
+
+def test_zero_mad_falls_back_to_std_threshold(generator, result_cache):
+    engine = AnalysisEngine(subscriptions(generator, [-9.99] * 11 + [-49.99]), result_cache=result_cache)
+
+    unusual = engine._find_unusual_expenses('mad')
+    assert [row['montant'] for row in unusual] == [-49.99]
+    assert engine._find_unusual_expenses('std') == unusual
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from analysis_engine import AnalysisEngine
+from result_cache import ResultCache
+from schema import get_amounts, get_dates, to_compact, to_standard
+
+
+def test_compact_round_trip_keeps_dates_and_amounts(transactions):
+    compact = to_compact(transactions)
+
+    assert compact['jour'].dtype == np.int32
+    assert compact['montant_cents'].dtype == np.int64
+    assert isinstance(compact['categorie'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_series_equal(get_dates(compact), transactions['date'])
+    # Virgule fixe : les montants sont arrondis au centime (les salaires tirés ne le sont pas)
+    np.testing.assert_allclose(get_amounts(compact), transactions['montant'].round(2), rtol=0, atol=1e-9)
+
+    standard = to_standard(compact)
+    assert list(standard.columns) == list(transactions.columns)
+    assert standard['categorie'].astype(str).tolist() == transactions['categorie'].tolist()
+
+
+def test_engine_reads_compact_frames_like_standard_ones(transactions):
+    rounded = transactions.assign(montant=transactions['montant'].round(2))
+    standard = AnalysisEngine(rounded, result_cache=ResultCache())
+    compact = AnalysisEngine(to_compact(rounded), result_cache=ResultCache())
+
+    pd.testing.assert_frame_equal(compact.get_category_analysis(), standard.get_category_analysis())
+    compact_summary = compact.get_period_summary('last_3months')
+    standard_summary = standard.get_period_summary('last_3months')
+    pd.testing.assert_frame_equal(compact_summary.pop('categories'), standard_summary.pop('categories'))
+    assert compact_summary == standard_summary
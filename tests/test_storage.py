@@ -0,0 +1,89 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+import storage
+from storage import STORAGE_SCHEMA_VERSION, TransactionStore, load_columnar, read_metadata, save_columnar
+
+
+def test_write_splits_by_month_and_loads_everything(tmp_path, transactions):
+    store = TransactionStore(str(tmp_path / 'store'))
+    store.write(transactions)
+
+    manifest = store.read_manifest()
+    months = transactions['date'].dt.strftime('%Y-%m').unique()
+    assert sorted(segment['partition'] for segment in manifest['segments']) == sorted(months)
+    for segment in manifest['segments']:
+        assert os.path.exists(os.path.join(store.root, segment['file']))
+
+    loaded = store.load(columns=['date', 'montant', 'categorie'])
+    assert loaded['date'].is_monotonic_increasing
+    pd.testing.assert_series_equal(loaded['date'], transactions['date'].reset_index(drop=True))
+    assert loaded['montant'].tolist() == transactions['montant'].tolist()
+    assert loaded['categorie'].astype(str).tolist() == transactions['categorie'].astype(str).tolist()
+
+
+def test_append_matches_single_write(tmp_path, generator, transactions):
+    cutoff = pd.Timestamp('2024-03-15')
+    history = transactions[transactions['date'] < cutoff]
+    batch = transactions.loc[transactions['date'] >= cutoff, ['date', 'description', 'montant']]
+
+    store = TransactionStore(str(tmp_path / 'store'))
+    first = store.write(history)
+    assert store.append(batch, generator) == first + 1
+    assert store.date_max() == transactions['date'].max()
+
+    columns = ['date', 'montant', 'categorie']
+    appended = store.load(columns=columns)
+    expected = transactions[columns].reset_index(drop=True)
+    assert appended['date'].tolist() == expected['date'].tolist()
+    assert appended['montant'].tolist() == expected['montant'].tolist()
+    assert appended['categorie'].astype(str).tolist() == expected['categorie'].astype(str).tolist()
+
+
+def test_failed_write_keeps_previous_dataset(tmp_path, monkeypatch, transactions):
+    store = TransactionStore(str(tmp_path / 'store'))
+    store.write(transactions)
+    before = store.load(columns=['date', 'montant'])
+
+    def failing_segment(self, manifest, df):
+        raise OSError('disque plein')
+    monkeypatch.setattr(TransactionStore, '_add_segment', failing_segment)
+    with pytest.raises(OSError):
+        store.write(transactions.iloc[:10])
+    monkeypatch.undo()
+
+    pd.testing.assert_frame_equal(store.load(columns=['date', 'montant']), before)
+
+    store.write(transactions.iloc[:10])
+    assert len(store.load(columns=['date'])) == 10
+    assert sorted(os.listdir(tmp_path)) == ['store']
+
+
+@pytest.mark.parametrize('extension', ['parquet', 'feather'])
+def test_columnar_round_trip_with_projection(tmp_path, transactions, extension):
+    filename = str(tmp_path / f'releve.{extension}')
+    save_columnar(transactions, filename)
+
+    assert read_metadata(filename)['schema_version'] == STORAGE_SCHEMA_VERSION
+    full = load_columnar(filename)
+    assert list(full.columns) == list(transactions.columns)
+    pd.testing.assert_series_equal(full['date'], transactions['date'])
+    assert full['montant'].tolist() == transactions['montant'].tolist()
+    # Colonnes dérivées recalculées à l'identique
+    assert full['semaine'].astype(int).tolist() == transactions['semaine'].astype(int).tolist()
+    assert full['type_transaction'].astype(str).tolist() == transactions['type_transaction'].tolist()
+
+    projected = load_columnar(filename, columns=['montant', 'mois'])
+    assert list(projected.columns) == ['montant', 'mois']
+
+
+def test_columnar_rejects_other_schema_version(tmp_path, monkeypatch, transactions):
+    filename = str(tmp_path / 'releve.parquet')
+    save_columnar(transactions, filename)
+    monkeypatch.setattr(storage, 'STORAGE_SCHEMA_VERSION', STORAGE_SCHEMA_VERSION + 1)
+    with pytest.raises(ValueError):
+        load_columnar(filename)
@@ -4,6 +4,8 @@ from plotly.subplots import make_subplots
 import pandas as pd
 import streamlit as st
 
+from schema import get_amounts
+
 class VisualizationEngine:
     """Moteur de visualisation pour l'assistant d'épargne"""
     
@@ -185,7 +187,9 @@ class VisualizationEngine:
         
         # Créer des données d'exemple pour l'heure (simulation)
         import random
-        df_copy = df[df['montant'] < 0].copy()
+        montants = get_amounts(df)
+        df_copy = df[montants < 0].copy()
+        df_copy['montant'] = montants[montants < 0]
         df_copy['heure'] = [random.randint(8, 22) for _ in range(len(df_copy))]
         
         # Mapping des jours en français
@@ -202,7 +206,7 @@ class VisualizationEngine:
         df_copy['jour_fr'] = df_copy['jour_semaine'].map(day_mapping)
         
         # Agrégation par jour et heure
-        heatmap_data = df_copy.groupby(['jour_fr', 'heure'])['montant'].sum().abs().reset_index()
+        heatmap_data = df_copy.groupby(['jour_fr', 'heure'], observed=True)['montant'].sum().abs().reset_index()
         heatmap_pivot = heatmap_data.pivot(index='jour_fr', columns='heure', values='montant').fillna(0)
         
         # Réorganiser les jours